@@ -1,7 +1,18 @@
-import csv, math, time, sys, os
-from statistics import median
+import time, sys, os
+import numpy as np
 from rplidar import RPLidar
-from utils.port_config import get_default_port
+from utils.port_config import get_default_port, set_low_latency
+from utils.lidar_io import (
+    accumulate_bins,
+    as_scan_array,
+    bin_indices,
+    max_bin_step,
+    points_xyz,
+    scan_to_points,
+    write_csv,
+    write_ply_ascii,
+    write_ply_binary,
+)
 
 BAUD = 115200
 
@@ -23,14 +34,81 @@ PLATEAU_ITERS = 4            # How many consecutive plateaus before early exit
 # Optional: Fill small gaps for PLY visualization (CSV remains unfilled merged data)
 FILL_GAPS_FOR_PLY = True
 FILL_MAX_GAP_DEG = 6.0       # Only fill gaps up to this many degrees
+PLY_BINARY = True            # False -> ASCII PLY for tools that cannot read binary
 
+# CSV output layout (one row per point)
+CSV_COLUMNS = ("quality", "angle_deg", "distance_mm", "x_m", "y_m", "z_m")
+CSV_FMT = ("%d", "%.4f", "%.2f", "%.6f", "%.6f", "%.6f")
 
-def _bin_index(angle_deg: float, bin_deg: float) -> int:
-    """Stable angle binning with wrap-around."""
-    a = angle_deg % 360.0
+
+def new_merge_state(bin_deg=ANGLE_BIN_DEG):
+    """
+    Create an empty incremental merge state.
+
+    Per-bin occupancy and max quality are kept up to date as scans arrive;
+    the (binned) distances are only stored so medians can be taken once at the end.
+    """
     total_bins = int(round(360.0 / bin_deg))
-    idx = int(round(a / bin_deg)) % total_bins
-    return idx
+    return {
+        "bin_deg": bin_deg,
+        "scan_count": 0,
+        "hits": np.zeros(total_bins, dtype=np.int64),
+        "best_q": np.full(total_bins, -1.0),
+        "bins": [],
+        "dists": [],
+    }
+
+
+def update_merge(state, scan):
+    """Fold one scan of (quality, angle_deg, distance_mm) samples into the merge state in place."""
+    state["scan_count"] += 1
+
+    # Structure-of-arrays view of the scan: quality / angle / distance columns.
+    arr = as_scan_array(scan)
+    q, ang, dist = arr[:, 0], arr[:, 1], arr[:, 2]
+    keep = np.isfinite(dist) & (dist > 0) & (dist >= MIN_DIST_MM) & (dist <= MAX_DIST_MM)
+    if not keep.any():
+        return state
+    q, ang, dist = q[keep], ang[keep], dist[keep]
+
+    bins = bin_indices(ang, state["bin_deg"])
+    accumulate_bins(state["hits"], state["best_q"], bins, q)
+    state["bins"].append(bins)
+    state["dists"].append(dist)
+    return state
+
+
+def finalize_merge(state):
+    """
+    Reduce the merge state to one point per occupied bin.
+
+    Returns:
+      merged: Nx3 float64 array of (quality, angle_deg, distance_mm), sorted by angle
+      hit_counts: dict[bin_idx] -> int  (#samples contributing to that bin)
+    """
+    if not state["dists"]:
+        return np.empty((0, 3), dtype=np.float64), {}
+
+    bins = np.concatenate(state["bins"])
+    dist = np.concatenate(state["dists"])
+
+    # Per-bin median distance: sort by (bin, dist), then pick the middle of each run.
+    order = np.lexsort((dist, bins))
+    dist_sorted = dist[order]
+    hit_bins = np.flatnonzero(state["hits"])
+    counts = state["hits"][hit_bins]
+    starts = np.cumsum(counts) - counts
+    lo = starts + (counts - 1) // 2
+    hi = starts + counts // 2
+
+    merged = np.empty((len(hit_bins), 3), dtype=np.float64)
+    merged[:, 0] = state["best_q"][hit_bins]
+    merged[:, 1] = (hit_bins * state["bin_deg"]) % 360.0
+    merged[:, 2] = 0.5 * (dist_sorted[lo] + dist_sorted[hi])
+    merged = merged[np.argsort(merged[:, 1], kind="stable")]
+
+    hit_counts = dict(zip(hit_bins.tolist(), counts.tolist()))
+    return merged, hit_counts
 
 
 def merge_scans_robust(scans, bin_deg=ANGLE_BIN_DEG):
@@ -43,71 +121,27 @@ def merge_scans_robust(scans, bin_deg=ANGLE_BIN_DEG):
       - angle:    bin center angle
 
     Returns:
-      merged: list[(quality, angle_deg, distance_mm)]
+      merged: Nx3 float64 array of (quality, angle_deg, distance_mm), sorted by angle
       hit_counts: dict[bin_idx] -> int  (#samples contributing to that bin)
     """
-    bin_dists = {}      # bin_idx -> [dist_mm, ...]
-    bin_quals = {}      # bin_idx -> max_quality
-
+    state = new_merge_state(bin_deg)
     for scan in scans:
-        for quality, angle, dist in scan:
-            if dist is None:
-                continue
-            try:
-                dist = float(dist)
-            except Exception:
-                continue
-            if dist <= 0:
-                continue
-            if dist < MIN_DIST_MM or dist > MAX_DIST_MM:
-                continue
-
-            idx = _bin_index(angle, bin_deg)
-            bin_dists.setdefault(idx, []).append(dist)
-            if idx not in bin_quals or quality > bin_quals[idx]:
-                bin_quals[idx] = quality
-
-    merged = []
-    hit_counts = {}
-
-    for idx, dists in bin_dists.items():
-        if not dists:
-            continue
-        dist_med = median(dists)
-        q = bin_quals.get(idx, 0)
-        ang = (idx * bin_deg) % 360.0
-        merged.append((q, ang, dist_med))
-        hit_counts[idx] = len(dists)
-
-    merged.sort(key=lambda t: t[1])
-    return merged, hit_counts
+        update_merge(state, scan)
+    return finalize_merge(state)
 
 
-def validate_scan_quality_bins(merged_scan, bin_deg=ANGLE_BIN_DEG, min_coverage=MIN_COVERAGE):
-    """
-    Validate based on occupied bins (more stable than raw point angles).
-    Returns: (is_valid, coverage_frac, max_gap_deg, point_count, message)
-    """
-    if not merged_scan or len(merged_scan) < 10:
-        return False, 0.0, 360.0, 0, "Too few points"
-
-    total_bins = int(round(360.0 / bin_deg))
-    hit_bins = sorted({_bin_index(angle, bin_deg) for _, angle, dist in merged_scan if dist > 0})
+def _validate_occupancy(occupied, bin_deg, min_coverage):
+    """Coverage / max-gap check on a per-bin occupancy vector."""
+    total_bins = len(occupied)
+    hit_bins = np.flatnonzero(occupied)
 
     if len(hit_bins) < 10:
         return False, 0.0, 360.0, len(hit_bins), "Too few valid bins"
 
     coverage = len(hit_bins) / total_bins
 
-    # Compute max angular gap between consecutive hit bins (bin centers).
-    max_gap = 0.0
-    for i in range(len(hit_bins)):
-        j = (i + 1) % len(hit_bins)
-        a = hit_bins[i]
-        b = hit_bins[j]
-        step = (b - a) % total_bins
-        gap_deg = step * bin_deg
-        max_gap = max(max_gap, gap_deg)
+    # Max angular gap between consecutive hit bins (bin centers), including wrap-around.
+    max_gap = float(max_bin_step(occupied)) * bin_deg
 
     is_valid = (coverage >= min_coverage) and (max_gap <= MAX_GAP_DEG)
 
@@ -115,51 +149,70 @@ def validate_scan_quality_bins(merged_scan, bin_deg=ANGLE_BIN_DEG, min_coverage=
     return is_valid, coverage, max_gap, len(hit_bins), message
 
 
+def validate_scan_quality_bins(merged_scan, bin_deg=ANGLE_BIN_DEG, min_coverage=MIN_COVERAGE):
+    """
+    Validate based on occupied bins (more stable than raw point angles).
+    Returns: (is_valid, coverage_frac, max_gap_deg, point_count, message)
+    """
+    if merged_scan is None or len(merged_scan) < 10:
+        return False, 0.0, 360.0, 0, "Too few points"
+
+    total_bins = int(round(360.0 / bin_deg))
+    arr = as_scan_array(merged_scan)
+    idx = bin_indices(arr[arr[:, 2] > 0, 1], bin_deg)
+
+    # Occupancy via bincount: np.flatnonzero yields the hit bins already sorted.
+    return _validate_occupancy(np.bincount(idx, minlength=total_bins), bin_deg, min_coverage)
+
+
+def validate_merge_state(state, min_coverage=MIN_COVERAGE):
+    """Same result as validate_scan_quality_bins(finalize_merge(state)[0]), without finalizing."""
+    if np.count_nonzero(state["hits"]) < 10:
+        return False, 0.0, 360.0, 0, "Too few points"
+    return _validate_occupancy(state["hits"], state["bin_deg"], min_coverage)
+
+
 def fill_small_gaps_for_visualization(merged_scan, bin_deg=ANGLE_BIN_DEG, max_fill_gap_deg=FILL_MAX_GAP_DEG):
     """
     Fill missing bins for nicer PLY output (linear interpolation in distance).
     Only fills gaps up to max_fill_gap_deg. Does NOT modify the original merged_scan.
     """
-    if not merged_scan:
+    if merged_scan is None or len(merged_scan) == 0:
         return merged_scan
 
     total_bins = int(round(360.0 / bin_deg))
-    by_bin = {}
-    for q, ang, dist in merged_scan:
-        idx = _bin_index(ang, bin_deg)
-        by_bin[idx] = (q, (idx * bin_deg) % 360.0, float(dist))
+    arr = as_scan_array(merged_scan)
+    idx = bin_indices(arr[:, 1], bin_deg)
 
-    hit_bins = sorted(by_bin.keys())
+    # One sample per occupied bin (last one wins), as columns ordered by bin.
+    hit_bins, last_rev = np.unique(idx[::-1], return_index=True)
     if len(hit_bins) < 2:
         return merged_scan
-
-    filled = dict(by_bin)
+    sel = len(idx) - 1 - last_rev
+    q_hit = arr[sel, 0]
+    d_hit = arr[sel, 2]
 
     max_fill_steps = int(round(max_fill_gap_deg / bin_deg))
 
-    for i in range(len(hit_bins)):
-        a = hit_bins[i]
-        b = hit_bins[(i + 1) % len(hit_bins)]
-        step = (b - a) % total_bins
-        if step <= 1:
-            continue
-        if step > max_fill_steps:
-            continue
+    # Gap from each hit bin to the next one (wrapping around), in bins.
+    nxt = np.roll(np.arange(len(hit_bins)), -1)
+    steps = (hit_bins[nxt] - hit_bins) % total_bins
+    gaps = np.flatnonzero((steps > 1) & (steps <= max_fill_steps))
 
-        qa, anga, da = by_bin[a]
-        qb, angb, db = by_bin[b]
+    # Expand every fillable gap into its missing bins k = 1 .. step-1.
+    n_fill = steps[gaps] - 1
+    g = np.repeat(gaps, n_fill)
+    k = np.arange(n_fill.sum()) - np.repeat(np.cumsum(n_fill) - n_fill, n_fill) + 1
+    t = k / steps[g]
 
-        for k in range(1, step):
-            idx = (a + k) % total_bins
-            t = k / step
-            d = (1.0 - t) * da + t * db
-            q = min(qa, qb)
-            ang = (idx * bin_deg) % 360.0
-            filled[idx] = (q, ang, d)
-
-    out = list(filled.values())
-    out.sort(key=lambda t: t[1])
-    return out
+    out = np.empty((len(hit_bins) + len(g), 3), dtype=np.float64)
+    out[:len(hit_bins), 0] = q_hit
+    out[:len(hit_bins), 1] = (hit_bins * bin_deg) % 360.0
+    out[:len(hit_bins), 2] = d_hit
+    out[len(hit_bins):, 0] = np.minimum(q_hit[g], q_hit[nxt[g]])
+    out[len(hit_bins):, 1] = (((hit_bins[g] + k) % total_bins) * bin_deg) % 360.0
+    out[len(hit_bins):, 2] = (1.0 - t) * d_hit[g] + t * d_hit[nxt[g]]
+    return out[np.argsort(out[:, 1], kind="stable")]
 
 
 def run_scan(port="auto", output_dir="data"):
@@ -167,6 +220,10 @@ def run_scan(port="auto", output_dir="data"):
         if port == "auto":
             port = get_default_port()
 
+        # Create the output dir up front so a permissions error aborts before scanning.
+        os.makedirs(output_dir, exist_ok=True)
+
+        set_low_latency(port)
         lidar = RPLidar(port, baudrate=BAUD, timeout=3)
 
         try:
@@ -177,13 +234,11 @@ def run_scan(port="auto", output_dir="data"):
             time.sleep(2)
 
             t0 = time.time()
-            collected_scans = []
+            merge_state = new_merge_state(ANGLE_BIN_DEG)
 
             last_coverage = 0.0
             plateau_count = 0
 
-            merged_scan = None
-
             for s in lidar.iter_scans(max_buf_meas=2000, min_len=50):
                 elapsed = time.time() - t0
                 if not s or len(s) < 50:
@@ -191,11 +246,13 @@ def run_scan(port="auto", output_dir="data"):
                         break
                     continue
 
-                collected_scans.append(s)
+                # Convert once at ingest; merge/validation only ever see the array form.
+                scan_arr = as_scan_array(s)
 
-                merged_scan, _ = merge_scans_robust(collected_scans, bin_deg=ANGLE_BIN_DEG)
-                is_valid, coverage, max_gap, point_count, msg = validate_scan_quality_bins(
-                    merged_scan, bin_deg=ANGLE_BIN_DEG, min_coverage=MIN_COVERAGE
+                # Fold in only the new revolution; medians are taken once after the loop.
+                update_merge(merge_state, scan_arr)
+                is_valid, coverage, max_gap, point_count, msg = validate_merge_state(
+                    merge_state, min_coverage=MIN_COVERAGE
                 )
 
                 if abs(coverage - last_coverage) < PLATEAU_EPS:
@@ -207,16 +264,21 @@ def run_scan(port="auto", output_dir="data"):
                 if is_valid:
                     break
 
-                if plateau_count >= PLATEAU_ITERS and len(collected_scans) >= 5:
+                scan_count = merge_state["scan_count"]
+
+                if plateau_count >= PLATEAU_ITERS and scan_count >= 5:
                     break
 
-                if len(collected_scans) >= MAX_SCANS_TO_MERGE:
+                if scan_count >= MAX_SCANS_TO_MERGE:
                     break
 
                 if elapsed > TIMEOUT_SEC:
                     break
 
-            if not merged_scan:
+            merged_scan, _ = finalize_merge(merge_state)
+            scans_merged = merge_state["scan_count"]
+
+            if len(merged_scan) == 0:
                 return {
                     'success': False,
                     'point_count': 0,
@@ -236,41 +298,21 @@ def run_scan(port="auto", output_dir="data"):
                     merged_scan, bin_deg=ANGLE_BIN_DEG, max_fill_gap_deg=FILL_MAX_GAP_DEG
                 )
 
-            def to_points(scan_list):
-                pts_local = []
-                for q, ang, dist in scan_list:
-                    if dist <= 0:
-                        continue
-                    r = float(dist) / 1000.0
-                    th = math.radians(float(ang))
-                    x = r * math.cos(th)
-                    y = r * math.sin(th)
-                    pts_local.append((int(q), float(ang), float(dist), x, y, 0.0))
-                return pts_local
-
-            pts_csv = to_points(merged_scan)
-            pts_ply = to_points(ply_scan)
-
-            os.makedirs(output_dir, exist_ok=True)
+            pts_csv = scan_to_points(merged_scan, ANGLE_BIN_DEG)
+            pts_ply = scan_to_points(ply_scan, ANGLE_BIN_DEG)
 
             csv_file = os.path.join(output_dir, "scan.csv")
             ply_file = os.path.join(output_dir, "scan.ply")
 
-            with open(csv_file, "w", newline="") as f:
-                w = csv.writer(f)
-                w.writerow(["quality", "angle_deg", "distance_mm", "x_m", "y_m", "z_m"])
-                w.writerows(pts_csv)
-
-            with open(ply_file, "w") as f:
-                f.write("ply\nformat ascii 1.0\n")
-                f.write(f"element vertex {len(pts_ply)}\n")
-                f.write("property float x\nproperty float y\nproperty float z\nend_header\n")
-                for _, _, _, x, y, z in pts_ply:
-                    f.write(f"{x:.6f} {y:.6f} {z:.6f}\n")
+            write_csv(csv_file, pts_csv, CSV_COLUMNS, CSV_FMT)
+            if PLY_BINARY:
+                write_ply_binary(ply_file, points_xyz(pts_ply))
+            else:
+                write_ply_ascii(ply_file, points_xyz(pts_ply))
 
             status_msg = f"Scan completed: {len(pts_csv)} points"
-            if len(collected_scans) > 1:
-                status_msg += f" (merged {len(collected_scans)} scans)"
+            if scans_merged > 1:
+                status_msg += f" (merged {scans_merged} scans)"
             if FILL_GAPS_FOR_PLY and len(pts_ply) != len(pts_csv):
                 status_msg += f" (PLY filled to {len(pts_ply)} pts)"
 
@@ -284,7 +326,7 @@ def run_scan(port="auto", output_dir="data"):
                     'is_valid': is_valid,
                     'coverage_percent': coverage * 100,
                     'max_gap_degrees': max_gap,
-                    'scans_merged': len(collected_scans),
+                    'scans_merged': scans_merged,
                     'angle_bin_deg': ANGLE_BIN_DEG,
                     'quality_message': msg
                 }
@@ -322,31 +364,36 @@ def main():
 
     result = run_scan(port=port, output_dir="data")
 
+    # Build the summary first and emit it with a single write/flush.
+    lines = []
     if result['success']:
-        print(f"\n{'='*60}", flush=True)
-        print("SCAN COMPLETED SUCCESSFULLY", flush=True)
-        print(f"{'='*60}", flush=True)
-        print(f"  Points captured (CSV): {result['point_count']}", flush=True)
+        lines.append(f"\n{'='*60}")
+        lines.append("SCAN COMPLETED SUCCESSFULLY")
+        lines.append(f"{'='*60}")
+        lines.append(f"  Points captured (CSV): {result['point_count']}")
 
         quality = result['scan_quality']
         if quality:
-            print(f"  Scans merged: {quality.get('scans_merged', 1)}", flush=True)
-            print(f"  Bin size: {quality.get('angle_bin_deg', ANGLE_BIN_DEG)}°", flush=True)
-            print(f"  Coverage: {quality.get('coverage_percent', 0):.1f}%", flush=True)
-            print(f"  Max gap: {quality.get('max_gap_degrees', 0):.1f}°", flush=True)
-            print(f"  Quality: {quality.get('quality_message', 'N/A')}", flush=True)
+            lines.append(f"  Scans merged: {quality.get('scans_merged', 1)}")
+            lines.append(f"  Bin size: {quality.get('angle_bin_deg', ANGLE_BIN_DEG)}°")
+            lines.append(f"  Coverage: {quality.get('coverage_percent', 0):.1f}%")
+            lines.append(f"  Max gap: {quality.get('max_gap_degrees', 0):.1f}°")
+            lines.append(f"  Quality: {quality.get('quality_message', 'N/A')}")
 
-        print("\n  Files saved:", flush=True)
+        lines.append("\n  Files saved:")
         for file in result['files']:
-            print(f"    - {file}", flush=True)
-        print(f"{'='*60}\n", flush=True)
+            lines.append(f"    - {file}")
+        lines.append(f"{'='*60}\n")
     else:
-        print(f"\n{'='*60}", flush=True)
-        print("SCAN FAILED", flush=True)
-        print(f"{'='*60}", flush=True)
-        print(f"  Error: {result['error']}", flush=True)
-        print(f"  Message: {result['message']}", flush=True)
-        print(f"{'='*60}\n", flush=True)
+        lines.append(f"\n{'='*60}")
+        lines.append("SCAN FAILED")
+        lines.append(f"{'='*60}")
+        lines.append(f"  Error: {result['error']}")
+        lines.append(f"  Message: {result['message']}")
+        lines.append(f"{'='*60}\n")
+
+    print("\n".join(lines), flush=True)
+    if not result['success']:
         sys.exit(1)
 
 
@@ -147,14 +147,11 @@ def main():
         print("⚠ No serial ports found on this system.")
         print("⚠ The RPLidar is NOT connected or drivers are not installed.")
     else:
-        # Check if any port looks like RPLidar
-        import serial.tools.list_ports
-        all_ports = serial.tools.list_ports.comports()
-        
+        # Check if any port looks like RPLidar (reuse the enumeration from list_all_ports)
         usb_serial_ports = []
         bluetooth_ports = []
         
-        for port in all_ports:
+        for port in ports:
             desc_lower = port.description.lower()
             hwid_lower = port.hwid.lower()
             
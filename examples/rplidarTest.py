@@ -1,4 +1,3 @@
-from rplidar import RPLidar
 import time
 import sys
 import os
@@ -11,6 +10,10 @@ from utils.port_config import get_default_port, print_port_info
 BAUDRATE = 115200  # A1 default
 
 def main():
+    # Deferred so port detection output appears before the heavier imports load
+    import numpy as np
+    from rplidar import RPLidar
+
     # Auto-detect port or use OS-appropriate default
     port_name = get_default_port()
     
@@ -34,11 +37,12 @@ def main():
         # max_buf_meas limits how much the lib buffers before yielding
         for i, scan in enumerate(lidar.iter_scans(max_buf_meas=800)):
             # scan is a list of tuples: (quality, angle_deg, distance_mm)
-            distances = [d for (_, _, d) in scan if d > 0]
-            if distances:
+            distances = np.fromiter((d for (_, _, d) in scan), dtype=np.float32, count=len(scan))
+            distances = distances[distances > 0]
+            if distances.size:
                 print(
                     f"scan {i}: points={len(scan)} "
-                    f"min={min(distances):.1f}mm max={max(distances):.1f}mm"
+                    f"min={distances.min():.1f}mm max={distances.max():.1f}mm"
                 )
 
             # print a few sample points (optional)
@@ -164,7 +164,7 @@ class LaptopViewerClient(MQTTClientBase):
     def _handle_status_message(self, topic: str, payload: bytes):
         """Handle incoming status message."""
         try:
-            status = ScanStatus.from_json(payload.decode('utf-8'))
+            status = ScanStatus.from_json(payload)
             self.logger.info(f"Received status for {status.scan_id}: {status.status}")
             
             # Notify callback
@@ -177,7 +177,7 @@ class LaptopViewerClient(MQTTClientBase):
     def _handle_data_message(self, topic: str, payload: bytes):
         """Handle incoming data chunk."""
         try:
-            data_msg = DataMessage.from_json(payload.decode('utf-8'))
+            data_msg = DataMessage.from_json(payload)
             scan_id = data_msg.scan_id
             
             self.logger.debug(f"Received data chunk {data_msg.chunk_index}/{data_msg.total_chunks} "
@@ -3,9 +3,14 @@ Base MQTT client wrapper for common functionality.
 """
 
 import paho.mqtt.client as mqtt
+from collections import OrderedDict
 from typing import Callable, Optional, Dict, Any
 import logging
 
+# Topics whose resolved callback is remembered; status/data topics are per scan,
+# so the least recently used entries are evicted beyond this
+DISPATCH_CACHE_SIZE = 256
+
 
 class MQTTClientBase:
     """
@@ -49,6 +54,8 @@ class MQTTClientBase:
         
         # Custom callbacks
         self.message_callbacks: Dict[str, Callable] = {}
+        # Resolved topic -> callback (None = general handler), LRU-bounded; cleared on subscribe
+        self._dispatch_cache: "OrderedDict[str, Optional[Callable]]" = OrderedDict()
     
     def connect(self) -> bool:
         """
@@ -86,6 +93,7 @@ class MQTTClientBase:
         
         if callback:
             self.message_callbacks[topic] = callback
+            self._dispatch_cache = OrderedDict()
     
     def publish(self, topic: str, payload: str, qos: Optional[int] = None) -> bool:
         """
@@ -133,11 +141,11 @@ class MQTTClientBase:
     def _on_message(self, client, userdata, msg):
         """Internal callback for received messages."""
         try:
-            # Check for topic-specific callbacks
-            for topic_pattern, callback in self.message_callbacks.items():
-                if mqtt.topic_matches_sub(topic_pattern, msg.topic):
-                    callback(msg.topic, msg.payload)
-                    return
+            # Topic-specific callback: wildcard patterns are matched once per topic
+            callback = self._callback_for(msg.topic)
+            if callback is not None:
+                callback(msg.topic, msg.payload)
+                return
             
             # Fall back to general handler
             self.on_message_received(msg.topic, msg.payload)
@@ -145,6 +153,26 @@ class MQTTClientBase:
         except Exception as e:
             self.logger.error(f"Error processing message: {e}")
     
+    def _callback_for(self, topic: str) -> Optional[Callable]:
+        """Cached _resolve_callback(topic), keeping at most DISPATCH_CACHE_SIZE topics."""
+        cache = self._dispatch_cache
+        try:
+            callback = cache[topic]
+            cache.move_to_end(topic)
+        except KeyError:
+            callback = self._resolve_callback(topic)
+            cache[topic] = callback
+            if len(cache) > DISPATCH_CACHE_SIZE:
+                cache.popitem(last=False)
+        return callback
+    
+    def _resolve_callback(self, topic: str) -> Optional[Callable]:
+        """First registered callback (in subscription order) whose pattern matches topic, or None."""
+        for topic_pattern, callback in self.message_callbacks.items():
+            if mqtt.topic_matches_sub(topic_pattern, topic):
+                return callback
+        return None
+    
     # Override these methods in subclasses
     
     def on_connected(self):
@@ -5,13 +5,70 @@ All messages are serialized as JSON for transmission.
 """
 
 import json
+import math
 import base64
 import os
-from dataclasses import dataclass, asdict
-from typing import Optional, Dict, Any
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Union
 from enum import Enum
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:  # Optional: pip install orjson
+    orjson = None
+
+
+def _json_loads(data):
+    """Parse JSON from str or UTF-8 bytes (MQTT payloads need no .decode() first)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_default(value):
+    """Encode NumPy scalars/arrays (e.g. point counts from np.count_nonzero) as plain Python values."""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _jsonable(value):
+    """
+    Normalize a value the way orjson encodes it: NumPy values become Python values,
+    NaN/inf become None (null), enums their value and datetimes ISO strings, so both
+    backends emit equivalent, strict JSON (number formatting may differ, e.g. 1e16
+    vs 1e+16).
+    """
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, Enum):
+        return _jsonable(value.value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {(_jsonable(k) if isinstance(k, (Enum, datetime)) else k): _jsonable(v)
+                for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if hasattr(value, "tolist"):
+        return _jsonable(value.tolist())
+    return value
+
+
+def _json_dumps(message) -> str:
+    """
+    Serialize a flat message dataclass (orjson encodes dataclasses natively).
+    
+    Both backends produce equivalent JSON (the same value when parsed), not
+    byte-identical text.
+    """
+    if orjson is not None:
+        return orjson.dumps(message, default=_json_default,
+                            option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    # Fields are JSON scalars/dicts: no asdict() deep copy needed
+    return json.dumps(_jsonable(vars(message)), separators=(",", ":"), allow_nan=False)
+
 
 class StatusType(Enum):
     """Status types for scan operations."""
@@ -36,12 +93,12 @@ class ScanCommand:
     
     def to_json(self) -> str:
         """Serialize to JSON string."""
-        return json.dumps(asdict(self))
+        return _json_dumps(self)
     
     @classmethod
-    def from_json(cls, json_str: str) -> 'ScanCommand':
-        """Deserialize from JSON string."""
-        data = json.loads(json_str)
+    def from_json(cls, json_str: Union[str, bytes]) -> 'ScanCommand':
+        """Deserialize from a JSON string or raw UTF-8 payload bytes."""
+        data = _json_loads(json_str)
         return cls(**data)
     
     @classmethod
@@ -63,12 +120,12 @@ class StopCommand:
     
     def to_json(self) -> str:
         """Serialize to JSON string."""
-        return json.dumps(asdict(self))
+        return _json_dumps(self)
     
     @classmethod
-    def from_json(cls, json_str: str) -> 'StopCommand':
-        """Deserialize from JSON string."""
-        data = json.loads(json_str)
+    def from_json(cls, json_str: Union[str, bytes]) -> 'StopCommand':
+        """Deserialize from a JSON string or raw UTF-8 payload bytes."""
+        data = _json_loads(json_str)
         return cls(**data)
 
 
@@ -85,12 +142,12 @@ class StepCommand:
 
     def to_json(self) -> str:
         """Serialize to JSON string."""
-        return json.dumps(asdict(self))
+        return _json_dumps(self)
 
     @classmethod
-    def from_json(cls, json_str: str) -> 'StepCommand':
-        """Deserialize from JSON string."""
-        data = json.loads(json_str)
+    def from_json(cls, json_str: Union[str, bytes]) -> 'StepCommand':
+        """Deserialize from a JSON string or raw UTF-8 payload bytes."""
+        data = _json_loads(json_str)
         return cls(**data)
 
 
@@ -112,12 +169,12 @@ class ScanStatus:
     
     def to_json(self) -> str:
         """Serialize to JSON string."""
-        return json.dumps(asdict(self))
+        return _json_dumps(self)
     
     @classmethod
-    def from_json(cls, json_str: str) -> 'ScanStatus':
-        """Deserialize from JSON string."""
-        data = json.loads(json_str)
+    def from_json(cls, json_str: Union[str, bytes]) -> 'ScanStatus':
+        """Deserialize from a JSON string or raw UTF-8 payload bytes."""
+        data = _json_loads(json_str)
         return cls(**data)
     
     @classmethod
@@ -187,12 +244,12 @@ class DataMessage:
     
     def to_json(self) -> str:
         """Serialize to JSON string."""
-        return json.dumps(asdict(self))
+        return _json_dumps(self)
     
     @classmethod
-    def from_json(cls, json_str: str) -> 'DataMessage':
-        """Deserialize from JSON string."""
-        data = json.loads(json_str)
+    def from_json(cls, json_str: Union[str, bytes]) -> 'DataMessage':
+        """Deserialize from a JSON string or raw UTF-8 payload bytes."""
+        data = _json_loads(json_str)
         return cls(**data)
     
     @classmethod
@@ -266,7 +323,7 @@ class MessageDecoder:
     @staticmethod
     def decode_payload(payload: bytes) -> Dict[str, Any]:
         """Decode MQTT payload to dictionary."""
-        return json.loads(payload.decode('utf-8'))
+        return _json_loads(payload)
     
     @staticmethod
     def is_scan_command(topic: str) -> bool:
@@ -244,12 +244,12 @@ def _run_local_once(
 
             _patch_attr(
                 scan_module,
-                "merge_scans_robust",
+                "finalize_merge",
                 _record_call(
-                    "merge_scans_robust",
+                    "finalize_merge",
                     run_ctx.started_at_perf,
                     wrapped_events,
-                    scan_module.merge_scans_robust,
+                    scan_module.finalize_merge,
                     meta_factory=lambda result, args, kwargs: {
                         "merged_points": len(result[0]),
                         "hit_bins": len(result[1]),
@@ -274,6 +274,23 @@ def _run_local_once(
                 ),
                 originals,
             )
+            _patch_attr(
+                scan_module,
+                "validate_merge_state",
+                _record_call(
+                    "validate_merge_state",
+                    run_ctx.started_at_perf,
+                    wrapped_events,
+                    scan_module.validate_merge_state,
+                    meta_factory=lambda result, args, kwargs: {
+                        "is_valid": bool(result[0]),
+                        "coverage_percent": round(float(result[1]) * 100.0, 3),
+                        "max_gap_degrees": round(float(result[2]), 3),
+                        "point_count": int(result[3]),
+                    },
+                ),
+                originals,
+            )
             _patch_attr(
                 scan_module,
                 "fill_small_gaps_for_visualization",
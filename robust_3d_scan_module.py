@@ -8,14 +8,19 @@ import sys
 import os
 import time
 import math
-import csv
-import statistics
 import traceback
-from typing import List, Tuple, Optional, Callable
+from collections import deque
+from typing import Tuple, Optional, Callable
 import numpy as np
 import serial
 from rplidar import RPLidar
-from utils.port_config import get_default_port, get_default_servo_port
+from utils.port_config import get_default_port, get_default_servo_port, set_low_latency
+from utils.lidar_io import WRITE_BUFFER_BYTES, accumulate_bins, as_scan_array, write_csv
+
+try:
+    from numba import njit
+except ImportError:  # Optional: pip install numba
+    njit = None
 
 # ==============================================================================
 # DEFAULT CONFIGURATION
@@ -45,6 +50,9 @@ DEFAULTS = {
     'max_dist': 12000,
 }
 
+CSV_COLUMNS = ("x", "y", "z", "distance", "quality")
+CSV_FMT = ("%.4f", "%.4f", "%.4f", "%.4f", "%d")
+
 
 def _is_io_error(exc: Exception) -> bool:
     """Return True for common serial I/O failures (Errno 5)."""
@@ -72,6 +80,7 @@ def _safe_lidar_teardown(lidar: Optional[RPLidar]):
 
 def _init_lidar(lidar_port: str, baudrate: int, motor_pwm: int, spinup_s: float = 3.0) -> RPLidar:
     """Initialize lidar and set motor speed."""
+    set_low_latency(lidar_port)
     lidar = RPLidar(lidar_port, baudrate=baudrate)
     try:
         lidar.stop_motor()
@@ -180,20 +189,21 @@ class PicoServoController:
 # ROBUST SCANNING LOGIC
 # ==============================================================================
 
-def _bin_index(angle, bin_deg):
-    """Convert angle to bin index."""
-    return int((angle % 360.0) / bin_deg)
+def _bin_index(angles, bin_deg, n_bins):
+    """Convert an array of angles to bin indices."""
+    # Angles are non-negative after the mod, so truncating the scaled value is the floor
+    return (np.mod(angles, 360.0) * (1.0 / bin_deg)).astype(np.int64) % n_bins
 
 def capture_robust_slice(
     lidar: RPLidar,
     slice_name: str,
     config: dict,
-) -> Tuple[List[Tuple[float, float, float]], bool, dict]:
+) -> Tuple[np.ndarray, bool, dict]:
     """
     Captures a single 360-degree slice using robust median filtering.
     Stops when coverage plateaus (stabilizes) or max scans reached.
     
-    Returns: (List of (quality, angle, distance), had_io_error, slice_stats)
+    Returns: (Nx3 array of (quality, angle, distance) rows sorted by angle, had_io_error, slice_stats)
     """
     print(f"  > Starting capture for {slice_name}...")
     started_at = time.perf_counter()
@@ -207,12 +217,16 @@ def capture_robust_slice(
     MIN_DIST = config.get('min_dist', DEFAULTS['min_dist'])
     MAX_DIST = config.get('max_dist', DEFAULTS['max_dist'])
 
-    # Storage for binning
-    bin_dists = {}
-    bin_quals = {} # Keep max quality per bin for reference
+    # Storage for binning: per-bin hit count and max quality are updated per scan,
+    # distances are only kept so the medians can be taken once at the end
+    n_bins = int(math.ceil(360.0 / BIN_DEG))
+    hits = np.zeros(n_bins, dtype=np.int64)
+    best_q = np.full(n_bins, -1.0)
+    scan_bins = []
+    scan_dists = []
 
     # State for plateau detection
-    history_coverage = []
+    history_coverage = deque(maxlen=int(PLATEAU_ITERS))
     
     scan_count = 0
     had_io_error = False
@@ -235,29 +249,22 @@ def capture_robust_slice(
             scan_count += 1
             
             # Process current scan
-            for qual, ang, dist in scan:
-                if dist < MIN_DIST or dist > MAX_DIST:
-                    continue
-                
-                idx = _bin_index(ang, BIN_DEG)
-                
-                if idx not in bin_dists:
-                    bin_dists[idx] = []
-                bin_dists[idx].append(dist)
-                
-                # Track max quality
-                if idx not in bin_quals or qual > bin_quals[idx]:
-                    bin_quals[idx] = qual
+            arr = as_scan_array(scan)
+            dist = arr[:, 2]
+            keep = (dist >= MIN_DIST) & (dist <= MAX_DIST)
+            if keep.any():
+                bins = _bin_index(arr[keep, 1], BIN_DEG, n_bins)
+                scan_bins.append(bins)
+                scan_dists.append(dist[keep])
+                # Only bins seen for the first time change the coverage
+                filled_bins += len(np.unique(bins[hits[bins] == 0]))
+                accumulate_bins(hits, best_q, bins, arr[keep, 0])
 
             # --- Check Stop Conditions ---
             
             # 1. Calculate Coverage
-            filled_bins = len(bin_dists)
             coverage = filled_bins / total_possible_bins
-            
             history_coverage.append(coverage)
-            if len(history_coverage) > PLATEAU_ITERS:
-                history_coverage.pop(0)
 
             # 2. Check Plateau (Stability)
             is_stable = False
@@ -288,17 +295,21 @@ def capture_robust_slice(
         termination_reason = "io_error" if had_io_error else "exception"
         print(f"Error during slice capture: {e}")
 
-    # Compute Median Scan
-    merged_points = []
-    for idx, dists in bin_dists.items():
-        if not dists:
-            continue
-        
-        final_dist = statistics.median(dists)
-        final_qual = bin_quals.get(idx, 0)
-        final_ang = (idx * BIN_DEG) + (BIN_DEG / 2.0) # Center of bin
-        
-        merged_points.append((final_qual, final_ang, final_dist))
+    # Compute Median Scan: sort by (bin, dist), then take the middle of each bin's run
+    merged_points = np.empty((0, 3), dtype=np.float64)
+    if scan_dists:
+        dists = np.concatenate(scan_dists)
+        dists_sorted = dists[np.lexsort((dists, np.concatenate(scan_bins)))]
+        hit_bins = np.flatnonzero(hits)
+        counts = hits[hit_bins]
+        starts = np.cumsum(counts) - counts
+        lo = starts + (counts - 1) // 2
+        hi = starts + counts // 2
+
+        merged_points = np.empty((len(hit_bins), 3), dtype=np.float64)
+        merged_points[:, 0] = best_q[hit_bins]
+        merged_points[:, 1] = (hit_bins * BIN_DEG) + (BIN_DEG / 2.0) # Center of bin
+        merged_points[:, 2] = 0.5 * (dists_sorted[lo] + dists_sorted[hi])
     
     print(f"  > Slice complete. {len(merged_points)} valid points.")
     slice_stats = {
@@ -317,74 +328,55 @@ def capture_robust_slice(
 
 
 def _voxel_downsample_points(
-    points: List[Tuple[float, float, float, float, float]],
+    points,
     voxel_size_m: float,
-) -> List[Tuple[float, float, float, float, float]]:
+) -> np.ndarray:
     """Downsample cloud by voxel grid while preserving average geometry and max quality."""
-    if voxel_size_m <= 0.0 or len(points) <= 1:
-        return points
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 5)
+    if voxel_size_m <= 0.0 or len(pts) <= 1:
+        return pts
 
-    pts = np.asarray(points, dtype=np.float64)
     xyz = pts[:, :3]
     voxel_idx = np.floor(xyz / voxel_size_m).astype(np.int64)
 
     _, _, inverse = np.unique(voxel_idx, axis=0, return_index=True, return_inverse=True)
+    inverse = inverse.reshape(-1)
     voxel_count = int(inverse.max()) + 1 if inverse.size else 0
     if voxel_count == 0:
-        return points
+        return pts
 
     counts = np.bincount(inverse, minlength=voxel_count).astype(np.float64)
-    sum_x = np.bincount(inverse, weights=pts[:, 0], minlength=voxel_count)
-    sum_y = np.bincount(inverse, weights=pts[:, 1], minlength=voxel_count)
-    sum_z = np.bincount(inverse, weights=pts[:, 2], minlength=voxel_count)
-    sum_d = np.bincount(inverse, weights=pts[:, 3], minlength=voxel_count)
-
-    max_q = np.full(voxel_count, -np.inf, dtype=np.float64)
-    for i, v_idx in enumerate(inverse):
-        q = pts[i, 4]
-        if q > max_q[v_idx]:
-            max_q[v_idx] = q
-
-    reduced = []
-    for v_idx in range(voxel_count):
-        c = counts[v_idx]
-        if c <= 0:
-            continue
-        reduced.append(
-            (
-                float(sum_x[v_idx] / c),
-                float(sum_y[v_idx] / c),
-                float(sum_z[v_idx] / c),
-                float(sum_d[v_idx] / c),
-                float(max_q[v_idx]),
-            )
-        )
+    reduced = np.empty((voxel_count, 5), dtype=np.float64)
+    for col in range(4):
+        reduced[:, col] = np.bincount(inverse, weights=pts[:, col], minlength=voxel_count) / counts
 
+    reduced[:, 4] = -np.inf
+    np.maximum.at(reduced[:, 4], inverse, pts[:, 4])
     return reduced
 
 
 def _sor_filter_points(
-    points: List[Tuple[float, float, float, float, float]],
+    points,
     neighbors: int,
     std_ratio: float,
     radius_m: float,
     max_points: int,
     max_runtime_s: float,
-) -> Tuple[List[Tuple[float, float, float, float, float]], str]:
+) -> Tuple[np.ndarray, str]:
     """Apply a guarded SOR pass using local radius neighborhoods via spatial hashing."""
-    n_points = len(points)
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 5)
+    n_points = len(pts)
     if n_points <= 4:
-        return points, "sor_skipped_too_few_points"
+        return pts, "sor_skipped_too_few_points"
 
     if n_points > max_points:
-        return points, f"sor_skipped_point_cutoff_{n_points}>{max_points}"
+        return pts, f"sor_skipped_point_cutoff_{n_points}>{max_points}"
 
     k = max(1, int(neighbors))
     radius = max(1e-6, float(radius_m))
     radius2 = radius * radius
     t0 = time.time()
 
-    pts = np.asarray(points, dtype=np.float64)
     xyz = pts[:, :3]
     grid = np.floor(xyz / radius).astype(np.int64)
 
@@ -404,7 +396,7 @@ def _sor_filter_points(
 
     for i, cell in enumerate(grid):
         if max_runtime_s > 0 and (time.time() - t0) > max_runtime_s:
-            return points, f"sor_skipped_timeout_{max_runtime_s:.1f}s"
+            return pts, f"sor_skipped_timeout_{max_runtime_s:.1f}s"
 
         cx, cy, cz = int(cell[0]), int(cell[1]), int(cell[2])
         candidates = []
@@ -433,7 +425,7 @@ def _sor_filter_points(
     valid = ~np.isnan(mean_neighbor_dist)
     valid_count = int(np.sum(valid))
     if valid_count < max(10, int(0.25 * n_points)):
-        return points, "sor_skipped_insufficient_neighbors"
+        return pts, "sor_skipped_insufficient_neighbors"
 
     valid_vals = mean_neighbor_dist[valid]
     mu = float(np.mean(valid_vals))
@@ -443,13 +435,82 @@ def _sor_filter_points(
     keep_mask = valid & (mean_neighbor_dist <= threshold)
     kept = int(np.sum(keep_mask))
     if kept < max(10, int(0.35 * n_points)):
-        return points, "sor_skipped_over_prune_guard"
+        return pts, "sor_skipped_over_prune_guard"
 
-    keep_idx = np.where(keep_mask)[0]
-    filtered = [points[i] for i in keep_idx]
+    filtered = pts[keep_mask]
     removed = n_points - kept
     return filtered, f"sor_applied_removed_{removed}"
 
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _project_slice_jit(samples, sin_b, cos_b, points):
+        for i in range(samples.shape[0]):
+            r_m = samples[i, 2] / 1000.0
+            alpha = math.radians(samples[i, 1])
+            z = r_m * math.sin(alpha)
+            points[i, 0] = r_m * math.cos(alpha)
+            points[i, 1] = -z * sin_b
+            points[i, 2] = z * cos_b
+            points[i, 3] = r_m
+            points[i, 4] = samples[i, 0]
+else:
+    _project_slice_jit = None
+
+
+def _project_slice_points(slice_points_2d, servo_angle_deg: float) -> np.ndarray:
+    """
+    Project one slice of (quality, angle, distance) samples into 3D.
+
+    Returns an Nx5 float64 array of (x, y, z, range_m, quality) rows. x is along
+    the lidar's 0 deg axis; y and z are the in-plane coordinate rotated about x by
+    the servo angle, and are written to the PLY's y/z columns as-is.
+    """
+    samples = np.ascontiguousarray(slice_points_2d, dtype=np.float64).reshape(-1, 3)
+    points = np.empty((len(samples), 5), dtype=np.float64)
+
+    # Negate angle to fix left/right mirroring
+    beta = math.radians(-servo_angle_deg)
+
+    if _project_slice_jit is not None:
+        _project_slice_jit(samples, math.sin(beta), math.cos(beta), points)
+        return points
+
+    # Projection in the lidar plane (y = 0), then rotation about x by the servo angle
+    r_m = samples[:, 2] / 1000.0
+    alpha = np.radians(samples[:, 1])
+    z = r_m * np.sin(alpha)
+    points[:, 0] = r_m * np.cos(alpha)
+    points[:, 1] = -z * math.sin(beta)
+    points[:, 2] = z * math.cos(beta)
+    points[:, 3] = r_m
+    points[:, 4] = samples[:, 0]
+    return points
+
+def _write_intensity_ply(path: str, points, binary: bool = False) -> None:
+    """
+    Write (x, y, z, range_m, quality) rows as a PLY with quality as intensity.
+
+    ASCII by default (the segmentation tooling parses text PLY); binary writes
+    little-endian float32 records in a single pass.
+    """
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 5)
+    header = (
+        "ply\n"
+        f"format {'binary_little_endian' if binary else 'ascii'} 1.0\n"
+        f"element vertex {len(pts)}\n"
+        "property float x\nproperty float y\nproperty float z\n"
+        "property float intensity\nend_header\n"
+    )
+    if binary:
+        with open(path, 'wb', buffering=WRITE_BUFFER_BYTES) as f:
+            f.write(header.encode('ascii'))
+            np.ascontiguousarray(pts[:, [0, 1, 2, 4]], dtype='<f4').tofile(f)
+        return
+
+    with open(path, 'w', buffering=WRITE_BUFFER_BYTES) as f:
+        f.write(header)
+        np.savetxt(f, pts[:, [0, 1, 2, 4]], fmt="%.4f %.4f %.4f %g")
+
 # ==============================================================================
 # MAIN 3D SCAN ROUTINE (Wrapped for MQTT)
 # ==============================================================================
@@ -523,10 +584,12 @@ def run_scan(
     # Initialize
     servo = None
     lidar = None
-    all_points_3d = []
+    all_points_3d = []  # One Nx5 array per slice
+    raw_point_count = 0
     generated_files = []
     slice_analyses = []
     save_slice_files = bool(scan_config.get('save_slice_files', False))
+    ply_binary = bool(scan_config.get('ply_binary', False))
     last_servo_angle: Optional[float] = None
     steps = np.linspace(sweep_start, sweep_end, num_steps)
     
@@ -643,51 +706,19 @@ def run_scan(
             })
             
             # Process to 3D and Save Slice
-            slice_points_3d = []
-            # Negate angle to fix left/right mirroring
-            beta = math.radians(-servo_angle)
-            
-            for qual, lidar_angle_deg, r_mm in slice_points_2d:
-                r_m = r_mm / 1000.0
-                alpha = math.radians(lidar_angle_deg)
-                
-                # Projection Logic
-                x = r_m * math.cos(alpha)
-                z = r_m * math.sin(alpha)
-                y = 0.0
-                
-                # Rotation
-                y2 = y * math.cos(beta) - z * math.sin(beta)
-                z2 = y * math.sin(beta) + z * math.cos(beta)
-                
-                # Point: (x, y2, z2, intensity)
-                # Note: "x, y, z" in PLY usually maps to specific visualization axes.
-                # Here we use x, y2, z2.
-                
-                pt = (x, y2, z2, r_m, qual)
-                slice_points_3d.append(pt)
-                all_points_3d.append(pt)
+            slice_points_3d = _project_slice_points(slice_points_2d, float(servo_angle))
+            all_points_3d.append(slice_points_3d)
+            raw_point_count += len(slice_points_3d)
             
             # Optional local-only per-slice debug artifact.
             if save_slice_files:
                 slice_filename = f"robust_slice_{i}.ply"
                 slice_path = os.path.join(output_dir, slice_filename)
-                
-                with open(slice_path, 'w') as f:
-                    f.write("ply\n")
-                    f.write("format ascii 1.0\n")
-                    f.write(f"element vertex {len(slice_points_3d)}\n")
-                    f.write("property float x\n")
-                    f.write("property float y\n")
-                    f.write("property float z\n")
-                    f.write("property float intensity\n")
-                    f.write("end_header\n")
-                    for p in slice_points_3d:
-                        f.write(f"{p[0]:.4f} {p[1]:.4f} {p[2]:.4f} {p[4]}\n")
+                _write_intensity_ply(slice_path, slice_points_3d)
         
         # --- Automatic Stitching ---
-        if all_points_3d:
-            raw_points = all_points_3d
+        if raw_point_count:
+            raw_points = np.concatenate(all_points_3d)
             processed_points = raw_points
 
             # 1) Voxel downsample for payload reduction and local denoising.
@@ -736,17 +767,7 @@ def run_scan(
             
             progress_callback({'stage': 'saving', 'message': 'Saving stitched point cloud...'})
             
-            with open(stitched_path, 'w') as f:
-                f.write("ply\n")
-                f.write("format ascii 1.0\n")
-                f.write(f"element vertex {len(processed_points)}\n")
-                f.write("property float x\n")
-                f.write("property float y\n")
-                f.write("property float z\n")
-                f.write("property float intensity\n")
-                f.write("end_header\n")
-                for p in processed_points:
-                    f.write(f"{p[0]:.4f} {p[1]:.4f} {p[2]:.4f} {p[4]}\n")
+            _write_intensity_ply(stitched_path, processed_points, binary=ply_binary)
             
             generated_files.append(stitched_path)
             file_callback(stitched_path)
@@ -755,12 +776,9 @@ def run_scan(
             stitched_csv_filename = "robust_scan_full.csv"
             stitched_csv_path = os.path.join(output_dir, stitched_csv_filename)
 
-            with open(stitched_csv_path, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(["x", "y", "z", "distance", "quality"])
-                for p in processed_points:
-                    # p = (x, y, z, distance, quality)
-                    writer.writerow([f"{p[0]:.4f}", f"{p[1]:.4f}", f"{p[2]:.4f}", f"{p[3]:.4f}", int(p[4])])
+            # Rows are (x, y, z, distance, quality)
+            csv_rows = np.asarray(processed_points, dtype=np.float64).reshape(-1, 5)
+            write_csv(stitched_csv_path, csv_rows, CSV_COLUMNS, CSV_FMT)
 
             generated_files.append(stitched_csv_path)
             file_callback(stitched_csv_path)
@@ -769,7 +787,7 @@ def run_scan(
         return {
             'success': False,
             'stopped': False,
-            'point_count': len(all_points_3d),
+            'point_count': raw_point_count,
             'files': generated_files,
             'error': str(e),
             'message': f"Robust scan failed: {e}",
@@ -825,13 +843,13 @@ def run_scan(
     return {
         'success': True,
         'stopped': False,
-        'point_count': len(processed_points) if all_points_3d else 0,
+        'point_count': len(processed_points) if raw_point_count else 0,
         'files': generated_files,
         'error': None,
         'message': "Robust scan completed successfully",
         'scan_quality': {
-            'raw_points': len(all_points_3d),
-            'final_points': len(processed_points) if all_points_3d else 0,
+            'raw_points': raw_point_count,
+            'final_points': len(processed_points) if raw_point_count else 0,
             'voxel_size_m': float(scan_config.get('voxel_size_m', 0.0)),
             'sor_neighbors': int(scan_config.get('sor_neighbors', 0)),
             'sor_std_ratio': float(scan_config.get('sor_std_ratio', 0.0)),
@@ -101,7 +101,9 @@ def _run_scan_3d_worker(
                             "next_servo_angle": next_servo_angle,
                         }
                     )
-                time.sleep(0.05)
+                # Wake as soon as Step arrives instead of sleeping a fixed tick
+                # (stop is still noticed within 50 ms)
+                step_event.wait(0.05)
 
         # Build args based on function signature.
         import inspect
@@ -339,10 +341,16 @@ class RPiScannerService(MQTTClientBase):
         self.logger.warning("Disconnected from MQTT broker - will attempt reconnect")
 
     def _publish_started_status(self, scan_id: str, message: str, point_count: Optional[int] = None):
-        """Publish started/progress status updates."""
+        """
+        Publish started/progress status updates.
+        
+        Sent at QoS 0: each update supersedes the previous one, so a lost packet
+        needs no PUBACK round-trip or redelivery. Terminal statuses, data chunks
+        and commands keep the configured QoS.
+        """
         try:
             status = ScanStatus.create_started(scan_id, message=message, point_count=point_count)
-            self.publish(Topics.status_topic(scan_id), status.to_json())
+            self.publish(Topics.status_topic(scan_id), status.to_json(), qos=0)
         except Exception as e:
             self.logger.error(f"Failed to publish started status: {e}")
     
@@ -350,7 +358,7 @@ class RPiScannerService(MQTTClientBase):
         """Handle incoming scan command."""
         try:
             # Parse command
-            command = ScanCommand.from_json(payload.decode('utf-8'))
+            command = ScanCommand.from_json(payload)
             self.logger.info(f"Received scan command: {command.scan_id}, type: {command.scan_type}")
             
             # Check if already scanning
@@ -395,7 +403,7 @@ class RPiScannerService(MQTTClientBase):
     def _handle_stop_command(self, topic: str, payload: bytes):
         """Handle incoming stop command."""
         try:
-            command = StopCommand.from_json(payload.decode('utf-8'))
+            command = StopCommand.from_json(payload)
             self.logger.info(f"Received stop command for scan: {command.scan_id}")
 
             with self.state_lock:
@@ -430,7 +438,7 @@ class RPiScannerService(MQTTClientBase):
     def _handle_step_command(self, topic: str, payload: bytes):
         """Handle incoming step command for 3D scan progression."""
         try:
-            command = StepCommand.from_json(payload.decode('utf-8'))
+            command = StepCommand.from_json(payload)
             self.logger.info(f"Received step command for scan: {command.scan_id}")
 
             with self.state_lock:
@@ -897,10 +905,17 @@ class RPiScannerService(MQTTClientBase):
     def _count_csv_points(self, csv_file: str) -> int:
         """Count number of points in CSV file."""
         try:
-            with open(csv_file, 'r') as f:
-                # Skip header
-                next(f)
-                return sum(1 for line in f)
+            # Count raw newlines in 64 KB binary chunks; no per-line decode
+            lines = 0
+            last = b'\n'
+            with open(csv_file, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 16), b''):
+                    lines += chunk.count(b'\n')
+                    last = chunk[-1:]
+            if last != b'\n':
+                lines += 1  # Final row without a trailing newline
+            # Skip header
+            return max(lines - 1, 0)
         except Exception as e:
             self.logger.error(f"Error counting CSV points: {e}")
             return 0
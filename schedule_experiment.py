@@ -15,9 +15,7 @@ reduce total runtime without materially degrading point-cloud quality.
 from __future__ import annotations
 
 import argparse
-import csv
 import json
-import math
 import os
 import time
 from collections import Counter
@@ -27,6 +25,8 @@ from typing import Any, Callable, Dict, List, Optional, Tuple
 import numpy as np
 import yaml
 
+from utils.lidar_io import write_csv
+
 base_scan = None
 
 
@@ -126,59 +126,26 @@ def _reset_lidar_for_slice(lidar: Any) -> None:
         print(f"Lidar reset warning: {exc}")
 
 
-def _project_slice_points(
-    slice_points_2d: List[Tuple[float, float, float]],
-    servo_angle_deg: float,
-) -> List[Tuple[float, float, float, float, float]]:
-    points_3d: List[Tuple[float, float, float, float, float]] = []
-    beta = math.radians(-float(servo_angle_deg))
-
-    for qual, lidar_angle_deg, r_mm in slice_points_2d:
-        r_m = r_mm / 1000.0
-        alpha = math.radians(lidar_angle_deg)
-
-        x = r_m * math.cos(alpha)
-        z = r_m * math.sin(alpha)
-        y = 0.0
-
-        y2 = y * math.cos(beta) - z * math.sin(beta)
-        z2 = y * math.sin(beta) + z * math.cos(beta)
-        points_3d.append((x, y2, z2, r_m, qual))
-
-    return points_3d
+def _project_slice_points(slice_points_2d: np.ndarray, servo_angle_deg: float) -> np.ndarray:
+    return _require_base_scan()._project_slice_points(slice_points_2d, float(servo_angle_deg))
 
 
 def _save_cloud_files(
     output_dir: str,
-    points: List[Tuple[float, float, float, float, float]],
+    points: np.ndarray,
     prefix: str,
     file_callback: Callable[[str], None],
 ) -> List[str]:
+    bs = _require_base_scan()
     generated: List[str] = []
 
     ply_path = os.path.join(output_dir, f"{prefix}.ply")
-    with open(ply_path, "w", encoding="utf-8") as handle:
-        handle.write("ply\n")
-        handle.write("format ascii 1.0\n")
-        handle.write(f"element vertex {len(points)}\n")
-        handle.write("property float x\n")
-        handle.write("property float y\n")
-        handle.write("property float z\n")
-        handle.write("property float intensity\n")
-        handle.write("end_header\n")
-        for p in points:
-            handle.write(f"{p[0]:.4f} {p[1]:.4f} {p[2]:.4f} {p[4]}\n")
+    bs._write_intensity_ply(ply_path, points)
     generated.append(ply_path)
     file_callback(ply_path)
 
     csv_path = os.path.join(output_dir, f"{prefix}.csv")
-    with open(csv_path, "w", newline="", encoding="utf-8") as handle:
-        writer = csv.writer(handle)
-        writer.writerow(["x", "y", "z", "distance", "quality"])
-        for p in points:
-            writer.writerow(
-                [f"{p[0]:.4f}", f"{p[1]:.4f}", f"{p[2]:.4f}", f"{p[3]:.4f}", int(p[4])]
-            )
+    write_csv(csv_path, np.asarray(points, dtype=np.float64).reshape(-1, 5), bs.CSV_COLUMNS, bs.CSV_FMT)
     generated.append(csv_path)
     file_callback(csv_path)
     return generated
@@ -255,7 +222,7 @@ def _capture_slice_at_angle(
     reinit_spinup_s: float,
     servo_settle: float,
     progress_callback: Callable[[Dict[str, Any]], None],
-) -> Tuple[Any, List[Tuple[float, float, float]], Dict[str, Any]]:
+) -> Tuple[Any, np.ndarray, Dict[str, Any]]:
     bs = _require_base_scan()
     progress_callback(
         {
@@ -273,7 +240,7 @@ def _capture_slice_at_angle(
 
     attempt = 0
     slice_attempts: List[Dict[str, Any]] = []
-    slice_points_2d: List[Tuple[float, float, float]] = []
+    slice_points_2d = np.empty((0, 3), dtype=np.float64)
     while True:
         slice_points_2d, had_io_error, slice_stats = bs.capture_robust_slice(
             lidar,
@@ -403,7 +370,7 @@ def run_scan(
     pass1_results: Dict[int, Dict[str, Any]] = {}
     pass2_results: Dict[int, Dict[str, Any]] = {}
     stopped = False
-    processed_points: List[Tuple[float, float, float, float, float]] = []
+    processed_points = np.empty((0, 5), dtype=np.float64)
     last_servo_angle: Optional[float] = None
     pass1_elapsed_ms = 0.0
     pass2_elapsed_ms = 0.0
@@ -520,7 +487,8 @@ def run_scan(
                 }
             pass2_elapsed_ms = round((time.perf_counter() - pass2_started) * 1000.0, 3)
 
-        all_points_3d: List[Tuple[float, float, float, float, float]] = []
+        all_points_3d: List[np.ndarray] = []
+        raw_point_count = 0
         final_slice_analyses: List[Dict[str, Any]] = []
 
         for index, servo_angle in enumerate(steps):
@@ -528,7 +496,8 @@ def run_scan(
                 continue
             final_result = pass2_results.get(index, pass1_results[index])
             points_3d = _project_slice_points(final_result["points_2d"], float(servo_angle))
-            all_points_3d.extend(points_3d)
+            all_points_3d.append(points_3d)
+            raw_point_count += len(points_3d)
 
             final_analysis = dict(final_result["analysis"])
             final_analysis["selected_for_revisit"] = bool(index in pass2_results)
@@ -539,8 +508,8 @@ def run_scan(
                 final_analysis["pass2_analysis"] = pass2_results[index]["analysis"]
             final_slice_analyses.append(final_analysis)
 
-        if all_points_3d:
-            raw_points = all_points_3d
+        if raw_point_count:
+            raw_points = np.concatenate(all_points_3d)
             processed_points = raw_points
 
             voxel_size_m = float(scan_config.get("voxel_size_m", 0.0))
@@ -598,13 +567,13 @@ def run_scan(
         return {
             "success": True,
             "stopped": stopped,
-            "point_count": len(processed_points) if all_points_3d else 0,
+            "point_count": len(processed_points) if raw_point_count else 0,
             "files": generated_files,
             "error": None,
             "message": "Scheduling experiment completed successfully",
             "scan_quality": {
-                "raw_points": len(all_points_3d),
-                "final_points": len(processed_points) if all_points_3d else 0,
+                "raw_points": raw_point_count,
+                "final_points": len(processed_points) if raw_point_count else 0,
                 "voxel_size_m": float(scan_config.get("voxel_size_m", 0.0)),
                 "sor_neighbors": int(scan_config.get("sor_neighbors", 0)),
                 "sor_std_ratio": float(scan_config.get("sor_std_ratio", 0.0)),
@@ -0,0 +1,84 @@
+import logging
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import pytest
+
+mqtt = pytest.importorskip("paho.mqtt.client")
+
+from mqtt_protocol import client_base
+from mqtt_protocol.client_base import MQTTClientBase
+
+
+class _FakePahoClient:
+    def subscribe(self, topic, qos=0):
+        pass
+
+
+def _make_client():
+    """MQTTClientBase without a broker connection (paho's Client is never created)."""
+    client = MQTTClientBase.__new__(MQTTClientBase)
+    client.client = _FakePahoClient()
+    client.qos = 1
+    client.logger = logging.getLogger("test")
+    client.message_callbacks = {}
+    client._dispatch_cache = OrderedDict()
+    client.received = []
+    client.on_message_received = lambda topic, payload: client.received.append(("general", topic))
+    return client
+
+
+def _baseline_dispatch(message_callbacks, topic):
+    """Pre-cache dispatch: first registered pattern matching the topic wins."""
+    for topic_pattern, callback in message_callbacks.items():
+        if mqtt.topic_matches_sub(topic_pattern, topic):
+            return callback
+    return None
+
+
+PATTERNS = [
+    "rplidar/status/#",
+    "rplidar/status/scan_1",
+    "rplidar/data/+/chunk",
+    "rplidar/data/scan_1/chunk",
+    "rplidar/command",
+]
+
+TOPICS = [
+    "rplidar/status/scan_1",
+    "rplidar/status/scan_2",
+    "rplidar/data/scan_1/chunk",
+    "rplidar/data/scan_9/chunk",
+    "rplidar/command",
+    "rplidar/other",
+]
+
+
+@pytest.mark.parametrize("patterns", [PATTERNS, list(reversed(PATTERNS))])
+def test_dispatch_precedence_matches_linear_scan(patterns):
+    client = _make_client()
+    for pattern in patterns:
+        client.subscribe(pattern, lambda topic, payload, pattern=pattern: client.received.append((pattern, topic)))
+
+    for _ in range(2):  # second pass is served from the cache
+        for topic in TOPICS:
+            client.received.clear()
+            client._on_message(None, None, SimpleNamespace(topic=topic, payload=b"{}"))
+            expected = _baseline_dispatch(client.message_callbacks, topic)
+            if expected is None:
+                assert client.received == [("general", topic)]
+            else:
+                expected(topic, b"{}")
+                assert client.received[0] == client.received[1]
+
+
+def test_dispatch_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(client_base, "DISPATCH_CACHE_SIZE", 8)
+    client = _make_client()
+    client.subscribe("rplidar/status/#", lambda topic, payload: None)
+
+    for i in range(50):
+        client._on_message(None, None, SimpleNamespace(topic=f"rplidar/status/scan_{i}", payload=b"{}"))
+
+    assert len(client._dispatch_cache) == 8
+    assert list(client._dispatch_cache)[-1] == "rplidar/status/scan_49"
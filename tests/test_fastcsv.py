@@ -0,0 +1,66 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from viewer import _fastcsv
+
+MALFORMED = {
+    "non_numeric": "x_m,y_m,z_m\n1.0,2.0,3.0\n4.0,oops,6.0\n7.0,8.0,9.0\n",
+    "short_row": "x_m,y_m,z_m\n1.0,2.0,3.0\n4.0,5.0\n7.0,8.0,9.0\n",
+}
+
+
+def _read(file_path, usecols):
+    """Same fallback chain as PointCloudLoader's CSV path."""
+    data = _fastcsv.parse_csv_columns(file_path, usecols)
+    if data is None:
+        data = np.loadtxt(file_path, delimiter=',', skiprows=1, usecols=usecols,
+                          dtype=np.float64, ndmin=2)
+    return data
+
+
+def _use_backend(monkeypatch, backend):
+    if backend == "numba":
+        if _fastcsv._parse_rows is None:
+            pytest.skip("numba not installed")
+        return
+    monkeypatch.setattr(_fastcsv, "_parse_rows", None)
+    if backend == "pandas":
+        if _fastcsv.pd is None:
+            pytest.skip("pandas not installed")
+    else:
+        monkeypatch.setattr(_fastcsv, "pd", None)
+
+
+@pytest.mark.parametrize("case", sorted(MALFORMED))
+@pytest.mark.parametrize("backend", ["numba", "pandas", "loadtxt"])
+def test_malformed_row_raises_on_every_backend(tmp_path, monkeypatch, backend, case):
+    _use_backend(monkeypatch, backend)
+    path = tmp_path / "scan.csv"
+    path.write_text(MALFORMED[case])
+
+    with pytest.raises(ValueError):
+        _read(str(path), (0, 1, 2))
+
+
+@pytest.mark.parametrize("backend", ["numba", "pandas", "loadtxt"])
+def test_well_formed_file_parses_on_every_backend(tmp_path, monkeypatch, backend):
+    _use_backend(monkeypatch, backend)
+    path = tmp_path / "scan.csv"
+    path.write_text("x_m,y_m,z_m\n1.0,2.0,3.0\n\n7.0,8.0,9.0\n")
+
+    data = _read(str(path), (2, 0))
+    np.testing.assert_array_equal(data, [[3.0, 1.0], [9.0, 7.0]])
+
+
+@pytest.mark.parametrize("backend", ["numba", "pandas", "loadtxt"])
+def test_header_only_file_is_empty_on_every_backend(tmp_path, monkeypatch, backend):
+    _use_backend(monkeypatch, backend)
+    path = tmp_path / "scan.csv"
+    path.write_text("x_m,y_m,z_m\n")
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # np.loadtxt warns about empty input
+        data = _read(str(path), (0, 1, 2))
+    assert data.shape == (0, 3)
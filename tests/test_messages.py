@@ -0,0 +1,82 @@
+import json
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from mqtt_protocol import messages
+from mqtt_protocol.messages import DataMessage, ScanStatus, StatusType
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    if request.param == "orjson":
+        if messages.orjson is None:
+            pytest.skip("orjson not installed")
+    else:
+        monkeypatch.setattr(messages, "orjson", None)
+    return request.param
+
+
+def _status():
+    return ScanStatus(
+        scan_id="scan_1",
+        status="started",
+        message="Slice 3/10",
+        timestamp="2026-01-01T00:00:00",
+        point_count=np.int64(1234),
+    )
+
+
+def _data():
+    return DataMessage(
+        scan_id="scan_1",
+        format="csv",
+        chunk_index=0,
+        total_chunks=1,
+        data="",
+        metadata={
+            "elevation_deg": 12.5,
+            "mean_range_m": np.float32(0.5),
+            "quality": np.array([10, 47]),
+            "missing": float("nan"),
+            "tiny": 1e-7,
+            "huge": 1e16,
+            "status": StatusType.STARTED,
+            "received": datetime(2026, 1, 1, 12, 30),
+            0: "first",
+        },
+    )
+
+
+def test_round_trip_with_numpy_and_float_fields(backend):
+    status = ScanStatus.from_json(_status().to_json())
+    assert status.point_count == 1234
+    assert type(status.point_count) is int
+
+    data = DataMessage.from_json(_data().to_json())
+    assert data.metadata == {
+        "elevation_deg": 12.5,
+        "mean_range_m": 0.5,
+        "quality": [10, 47],
+        "missing": None,
+        "tiny": 1e-7,
+        "huge": 1e16,
+        "status": "started",
+        "received": "2026-01-01T12:30:00",
+        "0": "first",
+    }
+
+
+def test_backends_emit_equivalent_strict_json(monkeypatch):
+    if messages.orjson is None:
+        pytest.skip("orjson not installed")
+    fast = [_status().to_json(), _data().to_json()]
+    monkeypatch.setattr(messages, "orjson", None)
+    slow = [_status().to_json(), _data().to_json()]
+
+    # Number formatting differs (1e16 vs 1e+16); the parsed values must not
+    assert [json.loads(text) for text in fast] == [json.loads(text) for text in slow]
+    for text in fast + slow:
+        # Strict parsers (orjson, browsers) reject NaN/Infinity literals
+        json.loads(text, parse_constant=lambda name: pytest.fail(f"non-standard constant {name}"))
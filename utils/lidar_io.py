@@ -0,0 +1,203 @@
+"""
+Shared scan conversion and output helpers for RPLidar captures.
+
+Holds the array-level pieces (binning, polar -> Cartesian, CSV/PLY writers)
+so scan entrypoints only keep their capture loop and tuning knobs.
+"""
+
+import math
+from functools import lru_cache
+from itertools import chain
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # Optional: pip install numba
+    njit = None
+
+WRITE_BUFFER_BYTES = 1 << 20  # Output file buffer size (collapses many small writes)
+DEG2RAD = np.pi / 180.0
+SMALL_SCAN_POINTS = 64  # Below this, a plain Python loop beats NumPy setup overhead
+
+# One record per converted point (field order matches the scan CSV columns)
+POINT_DTYPE = np.dtype([
+    ("q", np.int16),
+    ("ang", np.float64),
+    ("d", np.float64),
+    ("x", np.float64),
+    ("y", np.float64),
+    ("z", np.float64),
+])
+
+
+def bin_indices(angles_deg, bin_deg: float) -> np.ndarray:
+    """Stable angle binning with wrap-around, over an array of angles."""
+    total_bins = int(round(360.0 / bin_deg))
+    a = np.mod(angles_deg, 360.0)
+    return np.rint(a * (1.0 / bin_deg)).astype(np.int64) % total_bins
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _accumulate_bins_jit(hits, best_q, bins, q):
+        for i in range(bins.shape[0]):
+            b = bins[i]
+            hits[b] += 1
+            if q[i] > best_q[b]:
+                best_q[b] = q[i]
+
+    @njit(cache=True)
+    def _max_bin_step_jit(occupied):
+        n = occupied.shape[0]
+        first = -1
+        prev = -1
+        best = 0
+        for i in range(n):
+            if occupied[i]:
+                if first < 0:
+                    first = i
+                else:
+                    best = max(best, i - prev)
+                prev = i
+        if first >= 0:
+            best = max(best, first + n - prev)
+        return best
+else:
+    _accumulate_bins_jit = None
+    _max_bin_step_jit = None
+
+
+def accumulate_bins(hits: np.ndarray, best_q: np.ndarray, bins: np.ndarray, q: np.ndarray) -> None:
+    """In place: hits[b] += 1 and best_q[b] = max(best_q[b], q) for every sample."""
+    if _accumulate_bins_jit is not None:
+        _accumulate_bins_jit(hits, best_q, bins, q)
+        return
+    hits += np.bincount(bins, minlength=len(hits))
+    np.maximum.at(best_q, bins, q)
+
+
+def max_bin_step(occupied) -> int:
+    """Largest step (in bins) between consecutive occupied bins, including wrap-around."""
+    occupied = np.asarray(occupied)
+    if _max_bin_step_jit is not None:
+        return int(_max_bin_step_jit(occupied))
+    hit_bins = np.flatnonzero(occupied)
+    if len(hit_bins) == 0:
+        return 0
+    return int(np.diff(hit_bins, append=hit_bins[0] + len(occupied)).max())
+
+
+def as_scan_array(scan) -> np.ndarray:
+    """
+    View (quality, angle_deg, distance_mm) samples as an Nx3 float64 array.
+
+    Raw scans from iter_scans() are lists of tuples; np.fromiter over the flattened
+    values avoids NumPy's per-tuple sequence inspection. Arrays pass through untouched.
+    """
+    if isinstance(scan, np.ndarray):
+        return scan.astype(np.float64, copy=False).reshape(-1, 3)
+    return np.fromiter(chain.from_iterable(scan), dtype=np.float64, count=3 * len(scan)).reshape(-1, 3)
+
+
+@lru_cache(maxsize=8)
+def _trig_lut(bin_deg: float):
+    """cos/sin tables indexed by angle bin."""
+    rad = np.deg2rad(np.arange(int(round(360.0 / bin_deg))) * bin_deg)
+    return np.cos(rad), np.sin(rad)
+
+
+def scan_to_points(scan, bin_deg: float = 1.0) -> np.ndarray:
+    """
+    Convert (quality, angle_deg, distance_mm) samples to Cartesian points.
+
+    Angles that all sit on bin centers (merged / gap-filled scans) use cached
+    cos/sin tables; anything else falls back to np.cos/np.sin.
+
+    Returns:
+      POINT_DTYPE structured array with fields (q, ang, d, x, y, z), in metres for x/y/z.
+      Samples with non-positive distance are dropped.
+    """
+    if not isinstance(scan, np.ndarray) and len(scan) < SMALL_SCAN_POINTS:
+        return _scan_to_points_small(scan)
+
+    arr = as_scan_array(scan)
+    arr = arr[arr[:, 2] > 0]
+
+    r = arr[:, 2] / 1000.0
+    ang = arr[:, 1]
+    idx = bin_indices(ang, bin_deg)
+
+    if np.array_equal(idx * bin_deg, ang):
+        cos_lut, sin_lut = _trig_lut(bin_deg)
+        cos_t = cos_lut[idx]
+        sin_t = sin_lut[idx]
+    else:
+        th = ang * DEG2RAD
+        cos_t = np.cos(th)
+        sin_t = np.sin(th)
+
+    pts = np.empty(len(arr), dtype=POINT_DTYPE)
+    pts["q"] = arr[:, 0]
+    pts["ang"] = ang
+    pts["d"] = arr[:, 2]
+    pts["x"] = r * cos_t
+    pts["y"] = r * sin_t
+    pts["z"] = 0.0
+    return pts
+
+
+def _scan_to_points_small(scan) -> np.ndarray:
+    """Scalar path of scan_to_points() for short sample lists."""
+    rows = []
+    for q, ang, dist in scan:
+        if dist <= 0:
+            continue
+        r = dist / 1000.0
+        th = ang * DEG2RAD
+        rows.append((q, ang, dist, r * math.cos(th), r * math.sin(th), 0.0))
+    return np.array(rows, dtype=POINT_DTYPE)
+
+
+def points_xyz(pts) -> np.ndarray:
+    """Nx3 x/y/z view of a POINT_DTYPE array (plain Nx3 arrays pass through)."""
+    if pts.dtype.names:
+        return np.stack([pts["x"], pts["y"], pts["z"]], axis=1)
+    return pts[:, :3]
+
+
+def write_csv(path, rows: np.ndarray, columns, fmt) -> None:
+    """Write a 2D or structured array as CSV, formatting every row in one %-operation and a single write."""
+    rows = np.asarray(rows)
+    if rows.dtype.names:
+        flat = tuple(chain.from_iterable(rows.tolist()))
+    else:
+        flat = tuple(rows.ravel().tolist())
+    row_fmt = ",".join(fmt) + "\n"
+    text = ",".join(columns) + "\n" + (row_fmt * len(rows)) % flat
+    with open(path, "w", newline="", buffering=WRITE_BUFFER_BYTES) as f:
+        f.write(text)
+
+
+def write_ply_binary(path, xyz) -> None:
+    """Write Nx3 points as a binary little-endian PLY (float32 x/y/z)."""
+    xyz = np.ascontiguousarray(np.asarray(xyz)[:, :3], dtype="<f4")
+    with open(path, "wb", buffering=WRITE_BUFFER_BYTES) as f:
+        f.write(
+            b"ply\nformat binary_little_endian 1.0\n"
+            b"element vertex %d\n"
+            b"property float x\nproperty float y\nproperty float z\nend_header\n" % len(xyz)
+        )
+        xyz.tofile(f)
+
+
+def write_ply_ascii(path, xyz) -> None:
+    """Write Nx3 points as an ASCII PLY for tools that cannot read binary PLY."""
+    xyz = np.asarray(xyz, dtype=np.float64)[:, :3]
+    with open(path, "w", newline="\n", buffering=WRITE_BUFFER_BYTES) as f:
+        f.write(
+            "ply\nformat ascii 1.0\n"
+            f"element vertex {len(xyz)}\n"
+            "property float x\nproperty float y\nproperty float z\nend_header\n"
+        )
+        np.savetxt(f, xyz, fmt="%.6f %.6f %.6f")
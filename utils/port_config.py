@@ -7,7 +7,66 @@ serial ports, helping identify the correct port for the RPLidar device.
 
 import sys
 import os
+import logging
 import platform
+import re
+import subprocess
+import time
+
+try:
+    import serial.tools.list_ports as _list_ports
+except ImportError:
+    _list_ports = None
+
+# Port enumeration hits WMI/udev/IOKit; reuse the result for back-to-back lookups.
+COMPORTS_CACHE_TTL_SEC = 1.0
+_comports_cache = (0.0, None)
+
+# Ports set_low_latency() has already handled this process -> whether it succeeded
+_low_latency_ports = {}
+
+logger = logging.getLogger(__name__)
+
+# Common USB-serial chip identifiers (RPLidar uses a CP210x bridge)
+_USB_SERIAL_RE = re.compile(r"cp210|ch340|ftdi|usb serial|uart", re.IGNORECASE)
+
+
+def _comports():
+    """
+    Return the (briefly cached) list of serial ports.
+
+    Returns:
+        list or None: pyserial ListPortInfo objects, or None if pyserial is missing
+    """
+    global _comports_cache
+    if _list_ports is None:
+        return None
+
+    now = time.monotonic()
+    cached_at, ports = _comports_cache
+    if ports is None or (now - cached_at) > COMPORTS_CACHE_TTL_SEC:
+        ports = list(_list_ports.comports())
+        _comports_cache = (now, ports)
+    return ports
+
+
+def _scan_dev(prefixes):
+    """
+    Fast path: list /dev entries starting with any of the given prefixes.
+
+    Much cheaper than a full pyserial sysfs/IOKit walk when only the device
+    name is needed.
+
+    Returns:
+        list: Sorted device paths (e.g., ['/dev/ttyUSB0'])
+    """
+    try:
+        with os.scandir("/dev") as entries:
+            names = [e.name for e in entries if e.name.startswith(prefixes)]
+    except OSError:
+        return []
+    return ["/dev/" + name for name in sorted(names)]
+
 
 def get_available_ports():
     """
@@ -17,13 +76,11 @@ def get_available_ports():
         list: List of available port names (e.g., ['COM3', 'COM4'] on Windows
               or ['/dev/ttyUSB0', '/dev/ttyUSB1'] on Linux)
     """
-    try:
-        import serial.tools.list_ports
-        ports = serial.tools.list_ports.comports()
-        return [port.device for port in ports]
-    except ImportError:
+    ports = _comports()
+    if ports is None:
         print("Warning: pyserial not installed. Install with: pip install pyserial")
         return []
+    return [port.device for port in ports]
 
 
 def get_port_info():
@@ -33,12 +90,10 @@ def get_port_info():
     Returns:
         list: List of tuples containing (device, description, hwid)
     """
-    try:
-        import serial.tools.list_ports
-        ports = serial.tools.list_ports.comports()
-        return [(p.device, p.description, p.hwid) for p in ports]
-    except ImportError:
+    ports = _comports()
+    if ports is None:
         return []
+    return [(p.device, p.description, p.hwid) for p in ports]
 
 
 def find_rplidar_port():
@@ -51,39 +106,41 @@ def find_rplidar_port():
     Returns:
         str or None: The detected port name, or None if not found
     """
-    try:
-        import serial.tools.list_ports
-        ports = serial.tools.list_ports.comports()
-        
-        os_type = platform.system()
-        
-        if os_type == "Linux":
-            # Prefer /dev/ttyUSB0 on Linux (standard for USB-to-serial adapters)
-            for port in ports:
-                if "ttyUSB" in port.device:
-                    return port.device
-        
-        elif os_type == "Windows":
-            # On Windows, look for USB serial devices
-            # RPLidar typically shows up as a CP210x or similar USB-UART bridge
-            for port in ports:
-                desc_lower = port.description.lower()
-                hwid_lower = port.hwid.lower()
-                
-                # Common USB-serial chip identifiers
-                if any(keyword in desc_lower or keyword in hwid_lower 
-                       for keyword in ["cp210", "ch340", "ftdi", "usb serial", "uart"]):
-                    return port.device
-        
-        elif os_type == "Darwin":  # macOS
-            # On macOS, USB serial devices appear as /dev/cu.usbserial-* or similar
-            for port in ports:
-                if "usbserial" in port.device or "usbmodem" in port.device:
-                    return port.device
-        
-    except ImportError:
-        pass
-    
+    os_type = platform.system()
+
+    # Device-name checks only need a /dev listing on Linux/macOS.
+    if os_type == "Linux":
+        devices = _scan_dev(("ttyUSB",))
+        if devices:
+            return devices[0]
+    elif os_type == "Darwin":
+        devices = _scan_dev(("cu.usbserial", "cu.usbmodem"))
+        if devices:
+            return devices[0]
+
+    ports = _comports()
+    if ports is None:
+        return None
+
+    if os_type == "Linux":
+        # Prefer /dev/ttyUSB0 on Linux (standard for USB-to-serial adapters)
+        for port in ports:
+            if "ttyUSB" in port.device:
+                return port.device
+
+    elif os_type == "Windows":
+        # On Windows, look for USB serial devices
+        # RPLidar typically shows up as a CP210x or similar USB-UART bridge
+        for port in ports:
+            if _USB_SERIAL_RE.search(port.description) or _USB_SERIAL_RE.search(port.hwid):
+                return port.device
+
+    elif os_type == "Darwin":  # macOS
+        # On macOS, USB serial devices appear as /dev/cu.usbserial-* or similar
+        for port in ports:
+            if "usbserial" in port.device or "usbmodem" in port.device:
+                return port.device
+
     return None
 
 
@@ -94,59 +151,110 @@ def find_pico_port():
     Returns:
         str or None: Detected servo-controller serial port, or None if not found
     """
-    try:
-        import serial.tools.list_ports
-        ports = serial.tools.list_ports.comports()
-        os_type = platform.system()
+    ports = _comports()
+    if ports is None:
+        return None
+
+    os_type = platform.system()
 
-        scored = []
+    scored = []
+    for p in ports:
+        dev = (p.device or "")
+        desc = (p.description or "")
+        hwid = (p.hwid or "")
+        text = f"{desc} {hwid}".lower()
+
+        score = 0
+        if "pico" in text or "rp2040" in text:
+            score += 5
+        if "usb serial" in text or "cdc" in text:
+            score += 2
+
+        if os_type == "Linux" and "ttyACM" in dev:
+            score += 3
+        elif os_type == "Windows" and dev.upper().startswith("COM"):
+            score += 1
+        elif os_type == "Darwin" and ("usbmodem" in dev or "usbserial" in dev):
+            score += 1
+
+        if score > 0:
+            scored.append((score, dev))
+
+    if scored:
+        scored.sort(key=lambda x: x[0], reverse=True)
+        return scored[0][1]
+
+    # Fallback by common device naming when descriptors are unhelpful.
+    if os_type == "Linux":
         for p in ports:
-            dev = (p.device or "")
-            desc = (p.description or "")
-            hwid = (p.hwid or "")
-            text = f"{desc} {hwid}".lower()
-
-            score = 0
-            if "pico" in text or "rp2040" in text:
-                score += 5
-            if "usb serial" in text or "cdc" in text:
-                score += 2
-
-            if os_type == "Linux" and "ttyACM" in dev:
-                score += 3
-            elif os_type == "Windows" and dev.upper().startswith("COM"):
-                score += 1
-            elif os_type == "Darwin" and ("usbmodem" in dev or "usbserial" in dev):
-                score += 1
-
-            if score > 0:
-                scored.append((score, dev))
-
-        if scored:
-            scored.sort(key=lambda x: x[0], reverse=True)
-            return scored[0][1]
-
-        # Fallback by common device naming when descriptors are unhelpful.
-        if os_type == "Linux":
-            for p in ports:
-                if "ttyACM" in (p.device or ""):
-                    return p.device
-        elif os_type == "Darwin":
-            for p in ports:
-                d = (p.device or "")
-                if "usbmodem" in d or "usbserial" in d:
-                    return d
-        elif os_type == "Windows":
-            for p in ports:
-                d = (p.device or "")
-                if d.upper().startswith("COM"):
-                    return d
-    except ImportError:
-        pass
+            if "ttyACM" in (p.device or ""):
+                return p.device
+    elif os_type == "Darwin":
+        for p in ports:
+            d = (p.device or "")
+            if "usbmodem" in d or "usbserial" in d:
+                return d
+    elif os_type == "Windows":
+        for p in ports:
+            d = (p.device or "")
+            if d.upper().startswith("COM"):
+                return d
 
     return None
 
 
+def set_low_latency(port: str) -> bool:
+    """
+    Put a Linux USB-serial adapter into low-latency mode.
+
+    FTDI-style drivers buffer incoming bytes for latency_timer ms (16 by default)
+    before handing them to user space; lowering it to 1 ms trims per-packet delay.
+    Writing the sysfs knob (or running setserial) normally needs root or a udev rule.
+    Call it where the lidar port is opened; each port is only attempted once per process.
+
+    Args:
+        port: Serial device path (e.g., '/dev/ttyUSB0')
+
+    Returns:
+        bool: True if low-latency mode was applied
+    """
+    if platform.system() != "Linux" or not port.startswith("/dev/tty"):
+        return False
+    if port not in _low_latency_ports:
+        _low_latency_ports[port] = _apply_low_latency(port)
+    return _low_latency_ports[port]
+
+
+def _apply_low_latency(port: str) -> bool:
+    """One low-latency attempt for set_low_latency(): sysfs knob first, then setserial."""
+    name = os.path.basename(port)
+    latency_path = f"/sys/bus/usb-serial/devices/{name}/latency_timer"
+    if os.path.exists(latency_path):
+        try:
+            with open(latency_path, "w") as f:
+                f.write("1")
+            return True
+        except PermissionError:
+            pass
+        except OSError:
+            return False
+
+    try:
+        result = subprocess.run(
+            ["setserial", port, "low_latency"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=2,
+        )
+        if result.returncode == 0:
+            return True
+    except (OSError, subprocess.SubprocessError):
+        pass
+
+    logger.info("Could not enable low_latency on %s (needs sudo or a udev rule)", port)
+    return False
+
+
 def get_default_port():
     """
     Get the default port based on OS, or auto-detect if possible.
@@ -235,16 +343,14 @@ def select_port_interactive():
         try:
             choice = input(f"Select port [1-{len(ports_info)}] or enter custom port name: ").strip()
             
-            # Check if it's a number (selection from list)
-            if choice.isdigit():
+            # A number selects from the list; anything else is a custom port name
+            try:
                 idx = int(choice) - 1
-                if 0 <= idx < len(ports_info):
-                    return ports_info[idx][0]
-                else:
-                    print(f"Please enter a number between 1 and {len(ports_info)}")
-            else:
-                # Assume it's a custom port name
+            except ValueError:
                 return choice
+            if 0 <= idx < len(ports_info):
+                return ports_info[idx][0]
+            print(f"Please enter a number between 1 and {len(ports_info)}")
         except KeyboardInterrupt:
             print("\nCancelled.")
             sys.exit(0)
@@ -8,11 +8,24 @@ __version__ = "1.0.0"
 __author__ = "RPLidar Team"
 
 from . import config
-from .scan_controller import ScanController
-from .point_cloud_loader import PointCloudLoader
 
 __all__ = [
     "config",
     "ScanController",
     "PointCloudLoader",
 ]
+
+# Heavy submodules (MQTT client, Open3D) are resolved lazily on first access.
+_LAZY_ATTRS = {
+    "ScanController": ".scan_controller",
+    "PointCloudLoader": ".point_cloud_loader",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        from importlib import import_module
+        value = getattr(import_module(_LAZY_ATTRS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
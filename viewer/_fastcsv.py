@@ -0,0 +1,168 @@
+"""
+Compiled CSV column parser for scan files.
+
+Parses selected numeric columns straight from the raw file bytes with numba,
+one row per prange iteration. Without numba, pandas' C reader is used if it is
+installed; with neither, parse_csv_columns() returns None and callers keep
+using np.loadtxt.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # Optional: pip install numba
+    njit = None
+
+try:
+    import pandas as pd
+except ImportError:  # Optional: pip install pandas
+    pd = None
+
+_MAX_MANTISSA = 10 ** 17  # Digits beyond this only shift the exponent
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _parse_field(buf, start, end):
+        """Parse buf[start:end] as a decimal float; returns (value, ok)."""
+        while start < end and (buf[start] == 32 or buf[start] == 9):
+            start += 1
+        while end > start and (buf[end - 1] == 32 or buf[end - 1] == 9 or buf[end - 1] == 13):
+            end -= 1
+        if start == end:
+            return np.nan, False
+
+        i = start
+        neg = False
+        if buf[i] == 45:  # '-'
+            neg = True
+            i += 1
+        elif buf[i] == 43:  # '+'
+            i += 1
+
+        mant = 0
+        exp10 = 0
+        digits = 0
+        while i < end and 48 <= buf[i] <= 57:
+            if mant < _MAX_MANTISSA:
+                mant = mant * 10 + (np.int64(buf[i]) - 48)
+            else:
+                exp10 += 1
+            digits += 1
+            i += 1
+        if i < end and buf[i] == 46:  # '.'
+            i += 1
+            while i < end and 48 <= buf[i] <= 57:
+                if mant < _MAX_MANTISSA:
+                    mant = mant * 10 + (np.int64(buf[i]) - 48)
+                    exp10 -= 1
+                digits += 1
+                i += 1
+        if digits == 0:
+            return np.nan, False
+
+        if i < end and (buf[i] == 101 or buf[i] == 69):  # 'e' / 'E'
+            i += 1
+            exp_neg = False
+            if i < end and (buf[i] == 45 or buf[i] == 43):
+                exp_neg = buf[i] == 45
+                i += 1
+            exp_digits = 0
+            e = 0
+            while i < end and 48 <= buf[i] <= 57:
+                e = e * 10 + (np.int64(buf[i]) - 48)
+                exp_digits += 1
+                i += 1
+            if exp_digits == 0:
+                return np.nan, False
+            exp10 += -e if exp_neg else e
+
+        if i != end:
+            return np.nan, False
+
+        value = float(mant)
+        if exp10 < 0:
+            value = value / 10.0 ** (-exp10)
+        elif exp10 > 0:
+            value = value * 10.0 ** exp10
+        return (-value if neg else value), True
+
+    @njit(cache=True, parallel=True)
+    def _parse_rows(buf, starts, ends, colmap, out, ok):
+        n_out = out.shape[1]
+        for r in prange(starts.shape[0]):
+            field_start = starts[r]
+            end = ends[r]
+            col = 0
+            found = 0
+            good = True
+            for i in range(field_start, end + 1):
+                if i == end or buf[i] == 44:  # ','
+                    if col < colmap.shape[0] and colmap[col] >= 0:
+                        value, parsed = _parse_field(buf, field_start, i)
+                        out[r, colmap[col]] = value
+                        if parsed:
+                            found += 1
+                        else:
+                            good = False
+                    col += 1
+                    field_start = i + 1
+            ok[r] = good and found == n_out
+else:
+    _parse_rows = None
+
+
+def parse_csv_columns(file_path: str, usecols, skiprows: int = 1):
+    """
+    Read the given columns of a numeric CSV file as a float64 array.
+
+    Blank lines are skipped and a header-only file gives an empty array. As with
+    np.loadtxt, a row that is too short or holds a non-numeric value in a
+    selected column fails the whole file.
+
+    Returns:
+        (N, len(usecols)) float64 array, or None when neither numba nor pandas is available
+
+    Raises:
+        ValueError: if any non-blank row cannot be parsed
+    """
+    if _parse_rows is None:
+        if pd is None:
+            return None
+        usecols = list(usecols)
+        try:
+            frame = pd.read_csv(file_path, header=None, skiprows=skiprows, usecols=usecols,
+                                dtype=np.float64, engine="c", skip_blank_lines=True)
+        except pd.errors.EmptyDataError:
+            return np.empty((0, len(usecols)), dtype=np.float64)
+        # usecols comes back in file order; restore the requested order
+        frame = frame[usecols]
+        # The C reader pads short rows with NaN instead of failing
+        if frame.isna().any(axis=None):
+            raise ValueError(f"Malformed or short row(s) in {file_path}")
+        return frame.to_numpy(dtype=np.float64)
+
+    buf = np.fromfile(file_path, dtype=np.uint8)
+    newlines = np.flatnonzero(buf == 10)
+    starts = np.concatenate(([0], newlines + 1))[skiprows:]
+    ends = np.concatenate((newlines, [len(buf)]))[skiprows:]
+    nonblank = ends > starts
+    starts = np.ascontiguousarray(starts[nonblank])
+    ends = np.ascontiguousarray(ends[nonblank])
+
+    usecols = list(usecols)
+    colmap = np.full(max(usecols) + 1, -1, dtype=np.int64)
+    colmap[usecols] = np.arange(len(usecols))
+
+    out = np.empty((len(starts), len(usecols)), dtype=np.float64)
+    ok = np.zeros(len(starts), dtype=np.bool_)
+    _parse_rows(buf, starts, ends, colmap, out, ok)
+    bad = np.flatnonzero(~ok)
+    if len(bad):
+        # Report the first offending line (1-based, counting the skipped header rows)
+        first_line = int(np.count_nonzero(buf[:starts[bad[0]]] == 10)) + 1
+        raise ValueError(
+            f"{len(bad)} malformed row(s) in {file_path} (first at line {first_line})"
+        )
+    return out
@@ -4,32 +4,61 @@ RPLidar 3D Point Cloud Viewer Application
 Tabbed GUI application with scan control and visualization.
 """
 
+from __future__ import annotations
+
 import os
 import sys
 import glob
+import json
+import logging
+import queue
 import shutil
 import subprocess
 import threading
+import traceback
+from concurrent.futures import Future
+from datetime import datetime
+from multiprocessing import shared_memory
 import tkinter as tk
 from tkinter import filedialog
-import numpy as np
-import cv2
-import open3d as o3d
-import open3d.visualization.gui as gui
-import open3d.visualization.rendering as rendering
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from viewer import config
-from viewer.point_cloud_loader import PointCloudLoader
-from viewer.scan_controller import ScanController
-from viewer.panorama_stitcher import (
-    find_panorama_images,
-    stitch_equirectangular_panorama,
-    show_panorama_window,
+
+logger = logging.getLogger(__name__)
+
+# Tk filetypes for the Load File dialog
+POINT_CLOUD_FILETYPES = (
+    ("Point Cloud files", "*.ply *.csv"),
+    ("PLY files", "*.ply"),
+    ("CSV files", "*.csv"),
+    ("All files", "*.*"),
 )
 
+# Open3D pulls in Filament and ~100 MB of native code (and NumPy/OpenCV add more);
+# bind them on first use so that importing this module and parsing the command
+# line (e.g. --help) stays cheap.
+o3d = None
+gui = None
+np = None
+cv2 = None
+
+
+def _import_runtime_deps():
+    """Import the Open3D, NumPy and OpenCV modules used by the viewer (no-op after the first call)."""
+    global o3d, gui, np, cv2
+    if gui is None:
+        import numpy
+        import cv2 as opencv
+        import open3d
+        import open3d.visualization.gui as open3d_gui
+        np = numpy
+        cv2 = opencv
+        o3d = open3d
+        gui = open3d_gui
+
 
 class RPLidarViewerApp:
     """
@@ -42,11 +71,15 @@ class RPLidarViewerApp:
     
     def __init__(self):
         """Initialize the viewer application."""
-        print("[DEBUG] Initializing RPLidarViewerApp...")
+        logger.debug("Initializing RPLidarViewerApp...")
+        _import_runtime_deps()
+        from viewer.point_cloud_loader import PointCloudLoader
+        from viewer.scan_controller import ScanController
+
         # Initialize components
         self.loader = PointCloudLoader()
         self.scan_controller = ScanController()
-        print("[DEBUG] Components initialized")
+        logger.debug("Components initialized")
         
         # Set up callbacks
         self.scan_controller.set_status_callback(self._on_scan_status)
@@ -70,23 +103,49 @@ class RPLidarViewerApp:
         # State
         self.current_file = None
         self.current_pcd = None  # Store loaded point cloud
+        self.display_pcd = None  # Downsampled copy used for rendering (or current_pcd itself)
+        self._current_mtime = None  # mtime of current_file when it was loaded
+        self._render_preview_key = None  # (file, mtime, render_mode) of render_preview.ply
+        self._viewed_files = set()  # Source files shown this session (the viewer keeps a camera per source)
+        self._render_shm = None  # SharedMemory with the render preview as N x 6 float32 (xyz + rgb)
+        self._render_shm_spec = None  # "<name>:<count>" handed to the viewer for _render_shm
+        self._retired_shms = []  # (SharedMemory, count) superseded but possibly not yet read by the viewer
+        self._viewer_proc = None  # Long-lived standalone_viewer.py --daemon process
+        self._load_initial_dir = None  # config.DATA_DIR once it is known to exist
+        self._point_size_timer = None  # Pending debounced point-size push to the viewer
+        self._display_rebuild_timer = None  # Pending debounced display-copy rebuild
+        self._display_rebuild_seq = 0  # Bumped per rebuild/load; older worker results are dropped
+        self._tk_requests = None  # Dialog requests for the thread owning the hidden Tk root
+        self._tk_lock = threading.Lock()
+        self._loading = False  # True while a background load is in flight
+        self.display_density = 1.0  # Fraction of points shown (prefix of a shuffled order)
+        self.display_voxel = 0.0  # Display voxel size in metres (0 = automatic: only for huge clouds)
+        self.full_resolution = False  # Render the loaded cloud as-is (no display thinning)
+        self._display_order = None  # Cached random permutation of current_pcd's points
+        self.current_pcd_meta = None  # {"count", "min_bound", "max_bound"} of current_pcd, set once per load
         self.point_size = config.POINT_SIZE
         self.render_mode = "normal"
         self.render_preview_file = os.path.join(config.DATA_DIR, "render_preview.ply")
+
+        # Background-thread label updates are coalesced here; at most one drain is
+        # queued on the main thread at a time (see _set_pending_ui).
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._ui_drain_posted = False
         
     def initialize_gui(self):
         """Initialize the Open3D GUI window and widgets."""
-        print("[DEBUG] Initializing GUI...")
+        logger.debug("Initializing GUI...")
         app = gui.Application.instance
         app.initialize()
-        print("[DEBUG] GUI app initialized")
+        logger.debug("GUI app initialized")
         
         self.window = app.create_window(
             "RPLidar Scanner & Viewer",
             config.WINDOW_WIDTH,
             config.WINDOW_HEIGHT
         )
-        print("[DEBUG] Window created")
+        logger.debug("Window created")
         
         em = self.window.theme.font_size
         
@@ -97,22 +156,22 @@ class RPLidarViewerApp:
         self.tabs = gui.TabControl()
         
         # Tab 1: Scan Control
-        print("[DEBUG] Creating scan control tab...")
+        logger.debug("Creating scan control tab...")
         scan_tab = self._create_scan_tab(em)
         self.tabs.add_tab("Scan Control", scan_tab)
-        print("[DEBUG] Scan control tab added")
+        logger.debug("Scan control tab added")
         
         # Tab 2: Visualization Controls
-        print("[DEBUG] Creating visualization controls...")
+        logger.debug("Creating visualization controls...")
         viz_controls = self._create_visualization_controls(em)
-        print("[DEBUG] Visualization controls created, adding to tabs...")
+        logger.debug("Visualization controls created, adding to tabs...")
         self.tabs.add_tab("Visualization", viz_controls)
-        print("[DEBUG] Visualization tab added")
+        logger.debug("Visualization tab added")
 
-        print("[DEBUG] Creating panorama tab...")
+        logger.debug("Creating panorama tab...")
         panorama_tab = self._create_panorama_tab(em)
         self.tabs.add_tab("Panorama", panorama_tab)
-        print("[DEBUG] Panorama tab added")
+        logger.debug("Panorama tab added")
         
         # Add TabControl to main layout
         main_layout.add_child(self.tabs)
@@ -121,6 +180,42 @@ class RPLidarViewerApp:
         
         # Window callbacks
         self.window.set_on_close(self._on_close)
+        # Start the viewer process now so its Open3D import is done before the first Visualize
+        self._ensure_viewer_proc()
+
+    def _set_pending_ui(self, **updates):
+        """
+        Any thread: record the latest label values and queue one drain if none is queued.
+        
+        Updates arriving before the drain runs just overwrite the pending values, so
+        bursts of status messages cost one main-thread callback.
+        """
+        with self._pending_lock:
+            self._pending.update(updates)
+            if self._ui_drain_posted or self.window is None:
+                return
+            self._ui_drain_posted = True
+        gui.Application.instance.post_to_main_thread(self.window, self._drain_pending_ui)
+
+    def _drain_pending_ui(self):
+        """Main thread: apply the latest pending status values in one shot."""
+        with self._pending_lock:
+            pending = self._pending
+            self._pending = {}
+            self._ui_drain_posted = False
+
+        if "scan_status" in pending:
+            status, message = pending["scan_status"]
+            if self.scan_status_label:
+                self.scan_status_label.text = f"Status: {status} - {message}"
+
+        if pending.get("scan_finished"):
+            logger.debug("Scan finished, re-enabling buttons")
+            self.start_scan_btn.enabled = True
+            self.stop_scan_btn.enabled = False
+
+        if "panorama_status" in pending and self.panorama_status_label:
+            self.panorama_status_label.text = f"Status: {pending['panorama_status']}"
     
     def _create_scan_tab(self, em: float) -> gui.Widget:
         """Create the scan control tab."""
@@ -206,11 +301,11 @@ class RPLidarViewerApp:
     
     def _create_visualization_controls(self, em: float) -> gui.Widget:
         """Create the visualization control panel."""
-        print("[DEBUG] _create_visualization_controls called")
+        logger.debug("_create_visualization_controls called")
         try:
             # Vertical layout for controls
             controls = gui.Vert(0.5 * em, gui.Margins(em, em, em, em))
-            print("[DEBUG] Controls container created")
+            logger.debug("Controls container created")
             
             # Title
             title = gui.Label("Point Cloud Visualization")
@@ -224,9 +319,9 @@ class RPLidarViewerApp:
             # Top control bar
             control_bar = gui.Horiz(0.5 * em, gui.Margins(0, 0, 0, 0))
             
-            load_btn = gui.Button("Load File...")
-            load_btn.set_on_clicked(self._on_load_file)
-            control_bar.add_child(load_btn)
+            self.load_btn = gui.Button("Load File...")
+            self.load_btn.set_on_clicked(self._on_load_file)
+            control_bar.add_child(self.load_btn)
             
             clear_btn = gui.Button("Clear")
             clear_btn.set_on_clicked(self._on_clear)
@@ -257,6 +352,31 @@ class RPLidarViewerApp:
             size_horiz.add_child(self.point_size_slider)
             viz_panel.add_child(size_horiz)
 
+            # Display density (random subset; no re-parse when changed)
+            density_horiz = gui.Horiz(0.5 * em)
+            density_horiz.add_child(gui.Label("Display Density:"))
+            self.display_density_slider = gui.Slider(gui.Slider.DOUBLE)
+            self.display_density_slider.set_limits(0.05, 1.0)
+            self.display_density_slider.double_value = self.display_density
+            self.display_density_slider.set_on_value_changed(self._on_display_density_changed)
+            density_horiz.add_child(self.display_density_slider)
+            viz_panel.add_child(density_horiz)
+
+            # Display voxel size (spatially even thinning of the display copy)
+            voxel_horiz = gui.Horiz(0.5 * em)
+            voxel_horiz.add_child(gui.Label("Voxel Size (m, 0=auto):"))
+            self.display_voxel_slider = gui.Slider(gui.Slider.DOUBLE)
+            self.display_voxel_slider.set_limits(0.0, config.DISPLAY_VOXEL_MAX)
+            self.display_voxel_slider.double_value = self.display_voxel
+            self.display_voxel_slider.set_on_value_changed(self._on_display_voxel_changed)
+            voxel_horiz.add_child(self.display_voxel_slider)
+            viz_panel.add_child(voxel_horiz)
+
+            self.full_resolution_checkbox = gui.Checkbox("Full resolution (no display thinning)")
+            self.full_resolution_checkbox.checked = self.full_resolution
+            self.full_resolution_checkbox.set_on_checked(self._on_full_resolution_checked)
+            viz_panel.add_child(self.full_resolution_checkbox)
+
             viz_panel.add_fixed(em * 0.5)
 
             # Render mode selection (mutually exclusive)
@@ -306,11 +426,10 @@ class RPLidarViewerApp:
             controls.add_child(info_panel)
             controls.add_stretch()
             
-            print("[DEBUG] Visualization controls created successfully")
+            logger.debug("Visualization controls created successfully")
             return controls
         except Exception as e:
-            print(f"[DEBUG] ERROR in _create_visualization_controls: {e}")
-            import traceback
+            logger.error("Error in _create_visualization_controls: %s", e)
             traceback.print_exc()
             raise
 
@@ -372,21 +491,24 @@ class RPLidarViewerApp:
     
     def _on_close(self):
         """Handle window close event."""
-        print("[DEBUG] Window close requested")
+        logger.debug("Window close requested")
+        # Viewer first: it may still be attaching to a block handed over just before close
+        self._stop_viewer_proc(config.VIEWER_CLOSE_GRACE_SEC)
+        self._release_render_shm()
         try:
             if self.scan_controller.is_running():
-                print("[DEBUG] Stopping running scan...")
+                logger.debug("Stopping running scan...")
                 self.scan_controller.stop_scan()
-            print("[DEBUG] Cleanup complete")
+            logger.debug("Cleanup complete")
         except Exception as e:
-            print(f"[DEBUG] Error during cleanup: {e}")
+            logger.error("Error during cleanup: %s", e)
         return True
     
     def _on_start_scan(self):
         """Handle start scan button click."""
-        print("[DEBUG] Start scan button clicked")
+        logger.debug("Start scan button clicked")
         if self.scan_controller.is_running():
-            print("[DEBUG] Scan already running, ignoring")
+            logger.debug("Scan already running, ignoring")
             return
         
         # Determine selected scan type
@@ -396,26 +518,26 @@ class RPLidarViewerApp:
             scan_type = config.SCAN_TYPE_ROBUST_3D
         else:
             scan_type = config.SCAN_TYPE_2D
-        print(f"[DEBUG] Selected scan type: {scan_type}")
+        logger.debug("Selected scan type: %s", scan_type)
         
         # Get port if specified
         port = self.port_input.text_value.strip()
         params = {"port": port} if port else {}
         
-        print(f"[DEBUG] Port: '{port}', Params: {params}")
+        logger.debug("Port: '%s', Params: %s", port, params)
         
         # Disable start button, enable stop button
-        print("[DEBUG] Disabling start button, enabling stop button")
+        logger.debug("Disabling start button, enabling stop button")
         self.start_scan_btn.enabled = False
         self.stop_scan_btn.enabled = True
         
         # Start scan
-        print(f"[DEBUG] Starting scan with type={scan_type}, params={params}")
+        logger.debug("Starting scan with type=%s, params=%s", scan_type, params)
         started = self.scan_controller.start_scan(scan_type, params)
         if started:
-            print("[DEBUG] Scan started")
+            logger.debug("Scan started")
         else:
-            print("[DEBUG] Scan failed to start, restoring button state")
+            logger.debug("Scan failed to start, restoring button state")
             self.start_scan_btn.enabled = True
             self.stop_scan_btn.enabled = False
 
@@ -445,38 +567,28 @@ class RPLidarViewerApp:
     
     def _on_stop_scan(self):
         """Handle stop scan button click."""
-        print("[DEBUG] Stop scan button clicked")
+        logger.debug("Stop scan button clicked")
         self.scan_controller.stop_scan()
         self.start_scan_btn.enabled = True
         self.stop_scan_btn.enabled = False
     def _on_scan_status(self, status: str, message: str):
-        """Callback for scan status updates."""
-        print(f"[DEBUG] Scan status callback: status={status}, message={message}")
-        def update():
-            print(f"[DEBUG] Updating scan status label...")
-            if self.scan_status_label:
-                self.scan_status_label.text = f"Status: {status} - {message}"
-
-            # No longer need to enable step button - automatic mode only
-            # waiting_for_step = status == "started" and "Awaiting step permission" in message
-            # if self.step_scan_btn:
-            #     self.step_scan_btn.enabled = waiting_for_step
-
-            if status in ["completed", "error", "stopped"]:
-                print(f"[DEBUG] Scan finished, re-enabling buttons")
-                self.start_scan_btn.enabled = True
-                self.stop_scan_btn.enabled = False
-        
-        gui.Application.instance.post_to_main_thread(self.window, update)
+        """Callback for scan status updates (any thread); applied by the queued UI drain."""
+        logger.debug("Scan status callback: status=%s, message=%s", status, message)
+        if status in ["completed", "error", "stopped"]:
+            self._set_pending_ui(scan_status=(status, message), scan_finished=True)
+        else:
+            self._set_pending_ui(scan_status=(status, message))
     
     def _on_scan_complete(self, scan_type: str, success: bool, file_path: str):
         """Callback for scan completion."""
-        print(f"[DEBUG] Scan complete callback: type={scan_type}, success={success}, file={file_path}")
+        logger.debug("Scan complete callback: type=%s, success=%s, file=%s", scan_type, success, file_path)
         if scan_type == config.SCAN_TYPE_PANORAMA and success:
             print("[INFO] Panorama capture completed on RP5. Waiting for MQTT image reassembly on laptop...")
         if success and os.path.exists(file_path):
             # Just notify - don't auto-load to avoid threading issues
-            # User can manually switch to viz tab and load
+            # User can manually switch to viz tab and load; meanwhile parse the
+            # file into the loader cache so that load is served without file I/O.
+            threading.Thread(target=self.loader.prefetch, args=(file_path,), daemon=True).start()
             print(f"[INFO] Scan saved to: {file_path}")
             print(f"[INFO] Switch to Visualization tab and click 'Load File...' to view results")
 
@@ -493,7 +605,7 @@ class RPLidarViewerApp:
 
     def _on_scan_data(self, scan_id: str, scan_type: str, file_paths: list):
         """Callback for completed MQTT reassembly on laptop."""
-        print(f"[DEBUG] Scan data callback: id={scan_id}, type={scan_type}, files={len(file_paths)}")
+        logger.debug("Scan data callback: id=%s, type=%s, files=%s", scan_id, scan_type, len(file_paths))
         if scan_type != config.SCAN_TYPE_PANORAMA:
             return
 
@@ -549,6 +661,8 @@ class RPLidarViewerApp:
 
     def _auto_stitch_existing_images_if_ready(self):
         """Auto-stitch if expected capture frames are already present on disk."""
+        from viewer.panorama_stitcher import find_panorama_images
+
         images = find_panorama_images(config.PANORAMA_IMAGES_DIR)
         indexed = {}
         for p in images:
@@ -571,6 +685,8 @@ class RPLidarViewerApp:
 
     def _stitch_panorama_from_images(self, image_paths: list, auto_show: bool, scan_id: str):
         """Perform OpenCV stitch and optionally show the result."""
+        from viewer.panorama_stitcher import stitch_equirectangular_panorama
+
         ok, message, output_path = stitch_equirectangular_panorama(
             image_paths=image_paths,
             output_path=config.PANORAMA_STITCHED_FILE,
@@ -647,6 +763,8 @@ class RPLidarViewerApp:
 
     def _show_stitched_panorama(self):
         """Display latest stitched panorama in OpenCV window."""
+        from viewer.panorama_stitcher import show_panorama_window
+
         try:
             ok, message = show_panorama_window(self.panorama_last_output, "C270 Panorama")
             if ok:
@@ -666,7 +784,6 @@ class RPLidarViewerApp:
             if not os.path.exists(config.PERSISTENT_DIR):
                 os.makedirs(config.PERSISTENT_DIR)
 
-            from datetime import datetime
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             default_filename = f"panorama_{timestamp}.jpg"
             filename = self._ask_save_file_dialog(
@@ -716,12 +833,8 @@ class RPLidarViewerApp:
             self._update_panorama_status(f"Save images failed: {e}")
 
     def _update_panorama_status(self, message: str):
-        """Thread-safe panorama status update."""
-        def update():
-            if self.panorama_status_label:
-                self.panorama_status_label.text = f"Status: {message}"
-
-        gui.Application.instance.post_to_main_thread(self.window, update)
+        """Thread-safe panorama status update; applied by the queued UI drain."""
+        self._set_pending_ui(panorama_status=message)
 
     @staticmethod
     def _escape_applescript(text: str) -> str:
@@ -761,25 +874,13 @@ class RPLidarViewerApp:
             )
             return self._run_file_dialog_script(script)
 
-        selected_file = [None]
-
-        def ask_file():
-            root = tk.Tk()
-            root.withdraw()
-            root.attributes('-topmost', True)
-            filename = filedialog.askopenfilename(
-                parent=root,
-                title=title,
-                initialdir=initial_dir,
-                filetypes=filetypes,
-            )
-            root.destroy()
-            selected_file[0] = filename
-
-        dialog_thread = threading.Thread(target=ask_file)
-        dialog_thread.start()
-        dialog_thread.join()
-        return selected_file[0] or None
+        filename = self._run_tk_dialog(lambda root: filedialog.askopenfilename(
+            parent=root,
+            title=title,
+            initialdir=initial_dir,
+            filetypes=filetypes,
+        ))
+        return filename or None
 
     def _ask_save_file_dialog(
         self,
@@ -810,27 +911,15 @@ class RPLidarViewerApp:
                 filename = f"{filename}{default_extension}"
             return filename
 
-        selected_file = [None]
-
-        def ask_save_file():
-            root = tk.Tk()
-            root.withdraw()
-            root.attributes('-topmost', True)
-            filename = filedialog.asksaveasfilename(
-                parent=root,
-                title=title,
-                initialdir=initial_dir,
-                initialfile=initial_file,
-                defaultextension=default_extension,
-                filetypes=filetypes,
-            )
-            root.destroy()
-            selected_file[0] = filename
-
-        dialog_thread = threading.Thread(target=ask_save_file)
-        dialog_thread.start()
-        dialog_thread.join()
-        return selected_file[0] or None
+        filename = self._run_tk_dialog(lambda root: filedialog.asksaveasfilename(
+            parent=root,
+            title=title,
+            initialdir=initial_dir,
+            initialfile=initial_file,
+            defaultextension=default_extension,
+            filetypes=filetypes,
+        ))
+        return filename or None
 
     def _ask_directory_dialog(self, *, title: str, initial_dir: str) -> str | None:
         """Open directory chooser with a macOS-safe implementation."""
@@ -848,72 +937,128 @@ class RPLidarViewerApp:
             )
             return self._run_file_dialog_script(script)
 
-        selected_dir = [None]
-
-        def ask_dir():
+        folder = self._run_tk_dialog(lambda root: filedialog.askdirectory(
+            parent=root,
+            title=title,
+            initialdir=initial_dir,
+            mustexist=False,
+        ))
+        return folder or None
+
+    def _run_tk_dialog(self, show):
+        """
+        Run show(root) on the Tk dialog thread and wait for its result.
+
+        Tk objects may only be used from the thread that created them, so one
+        daemon thread owns a single hidden root that every dialog reuses.
+        """
+        with self._tk_lock:
+            if self._tk_requests is None:
+                self._tk_requests = queue.Queue()
+                threading.Thread(target=self._tk_dialog_loop, daemon=True).start()
+        future = Future()
+        self._tk_requests.put((show, future))
+        return future.result()
+
+    def _tk_dialog_loop(self):
+        """Tk dialog thread: create the hidden root once, then serve dialog requests."""
+        root = None
+        root_error = None
+        try:
             root = tk.Tk()
             root.withdraw()
-            root.attributes('-topmost', True)
-            folder = filedialog.askdirectory(
-                parent=root,
-                title=title,
-                initialdir=initial_dir,
-                mustexist=False,
-            )
-            root.destroy()
-            selected_dir[0] = folder
-
-        dialog_thread = threading.Thread(target=ask_dir)
-        dialog_thread.start()
-        dialog_thread.join()
-        return selected_dir[0] or None
+        except Exception as e:
+            root_error = e
+        while True:
+            show, future = self._tk_requests.get()
+            if root_error is not None:
+                future.set_exception(root_error)
+                continue
+            try:
+                root.attributes('-topmost', True)
+                future.set_result(show(root))
+            except Exception as e:
+                future.set_exception(e)
     
     def _on_load_file(self):
         """Handle load file button click."""
-        print("[DEBUG] Load file button clicked")
-        
+        logger.debug("Load file button clicked")
+        if config.NATIVE_FILE_DIALOG:
+            self._show_native_load_dialog()
+            return
+        # The dialog blocks until the user picks a file, so keep it off the GUI thread
+        threading.Thread(target=self._load_file_via_dialog, daemon=True).start()
+
+    def _show_native_load_dialog(self):
+        """Open Open3D's own file dialog (runs in the GUI event loop, no Tk)."""
+        dlg = gui.FileDialog(gui.FileDialog.OPEN, "Select Point Cloud File", self.window.theme)
+        dlg.add_filter(".ply .csv", "Point Cloud files (.ply, .csv)")
+        dlg.add_filter(".ply", "PLY files (.ply)")
+        dlg.add_filter(".csv", "CSV files (.csv)")
+        dlg.add_filter("", "All files")
+        dlg.set_path(self._get_load_initial_dir())
+        dlg.set_on_cancel(self.window.close_dialog)
+        dlg.set_on_done(self._on_native_load_done)
+        self.window.show_dialog(dlg)
+
+    def _get_load_initial_dir(self) -> str:
+        """Start directory for Load File: config.DATA_DIR (cached once it exists), else the CWD."""
+        if self._load_initial_dir is None:
+            if not os.path.isdir(config.DATA_DIR):
+                return os.getcwd()  # The first scan may still create it
+            self._load_initial_dir = config.DATA_DIR
+        return self._load_initial_dir
+
+    def _on_native_load_done(self, filename: str):
+        """Main thread: close the native dialog and load the chosen file."""
+        self.window.close_dialog()
+        logger.debug("File selected: %s", filename)
+        self.load_and_display_file(filename)
+    
+    def _load_file_via_dialog(self):
+        """Worker thread: ask for a file, then load it back on the main thread."""
         try:
-            initial_dir = config.DATA_DIR if os.path.exists(config.DATA_DIR) else os.getcwd()
-            print("[DEBUG] Opening file dialog...")
+            logger.debug("Opening file dialog...")
             filename = self._ask_open_file_dialog(
                 title="Select Point Cloud File",
-                initial_dir=initial_dir,
-                filetypes=[
-                    ("Point Cloud files", "*.ply *.csv"),
-                    ("PLY files", "*.ply"),
-                    ("CSV files", "*.csv"),
-                    ("All files", "*.*")
-                ],
+                initial_dir=self._get_load_initial_dir(),
+                filetypes=POINT_CLOUD_FILETYPES,
             )
             
             if filename:
-                print(f"[DEBUG] File selected: {filename}")
-                self.load_and_display_file(filename)
+                logger.debug("File selected: %s", filename)
+                gui.Application.instance.post_to_main_thread(
+                    self.window, lambda: self.load_and_display_file(filename)
+                )
             else:
-                print("[DEBUG] File dialog cancelled")
+                logger.debug("File dialog cancelled")
                 
         except Exception as e:
-            print(f"[DEBUG] File dialog error: {e}")
-            import traceback
+            logger.error("File dialog error: %s", e)
             traceback.print_exc()
     
     def _on_clear(self):
         """Handle clear button click."""
-        print("[DEBUG] Clear button clicked")
+        logger.debug("Clear button clicked")
         
         def clear_operation():
             try:
                 self.current_file = None
                 self.current_pcd = None
+                self.display_pcd = None
+                self._display_order = None
+                self.current_pcd_meta = None
+                self._current_mtime = None
+                self._render_preview_key = None
+                self._retire_render_shm()
                 self._update_info_label("No point cloud loaded")
                 self._update_viz_status("Cleared")
                 self.visualize_btn.enabled = False
                 self.save_ply_btn.enabled = False
-                print("[DEBUG] Clear complete")
+                logger.debug("Clear complete")
                 
             except Exception as e:
-                print(f"[DEBUG] Clear error: {e}")
-                import traceback
+                logger.error("Clear error: %s", e)
                 traceback.print_exc()
         
         # Post to main thread to ensure thread-safe GUI updates
@@ -921,10 +1066,10 @@ class RPLidarViewerApp:
     
     def _on_save_ply(self):
         """Handle save PLY button click - save point cloud with timestamp to persistent folder."""
-        print("[DEBUG] Save PLY button clicked")
+        logger.debug("Save PLY button clicked")
         
         if self.current_pcd is None:
-            print("[DEBUG] No point cloud loaded to save")
+            logger.debug("No point cloud loaded to save")
             self._update_viz_status("Error: No point cloud loaded")
             return
         
@@ -932,14 +1077,13 @@ class RPLidarViewerApp:
             # Ensure persistent directory exists
             if not os.path.exists(config.PERSISTENT_DIR):
                 os.makedirs(config.PERSISTENT_DIR)
-                print(f"[DEBUG] Created persistent directory: {config.PERSISTENT_DIR}")
+                logger.debug("Created persistent directory: %s", config.PERSISTENT_DIR)
             
             # Generate timestamped filename
-            from datetime import datetime
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             default_filename = f"scan_{timestamp}.ply"
             
-            print("[DEBUG] Opening save file dialog...")
+            logger.debug("Opening save file dialog...")
             filename = self._ask_save_file_dialog(
                 title="Save Point Cloud",
                 initial_dir=config.PERSISTENT_DIR,
@@ -952,7 +1096,7 @@ class RPLidarViewerApp:
             )
             
             if filename:
-                print(f"[DEBUG] Saving to: {filename}")
+                logger.debug("Saving to: %s", filename)
                 
                 # Save the point cloud
                 success = o3d.io.write_point_cloud(filename, self.current_pcd)
@@ -964,19 +1108,141 @@ class RPLidarViewerApp:
                     print(f"[ERROR] Failed to save point cloud to: {filename}")
                     self._update_viz_status("Error: Failed to save file")
             else:
-                print("[DEBUG] Save dialog cancelled")
+                logger.debug("Save dialog cancelled")
                 
         except Exception as e:
-            print(f"[DEBUG] Save error: {e}")
+            logger.error("Save error: %s", e)
             self._update_viz_status(f"Error: {str(e)}")
-            import traceback
             traceback.print_exc()
     
     def _on_point_size_changed(self, value):
         """Handle point size slider change."""
-        print(f"[DEBUG] Point size changed to: {value}")
+        logger.debug("Point size changed to: %s", value)
         self.point_size = float(value)
-        # Point size will be applied when visualize button is clicked
+        # Nothing is reloaded or rebuilt: an open viewer window just gets the new
+        # render option, and the next visualize passes the size along as usual.
+        # Drags fire once per step, so the push is debounced to the latest value.
+        if self._point_size_timer is None:
+            self._point_size_timer = threading.Timer(
+                config.POINT_SIZE_DEBOUNCE_SEC,
+                lambda: gui.Application.instance.post_to_main_thread(self.window, self._apply_point_size),
+            )
+            self._point_size_timer.daemon = True
+            self._point_size_timer.start()
+
+    def _apply_point_size(self):
+        """Main thread: send the latest point size to a running viewer."""
+        self._point_size_timer = None
+        if self._viewer_proc is not None and self._viewer_proc.poll() is None:
+            try:
+                self._send_viewer_request(["--point-size", str(int(self.point_size))])
+            except OSError as e:
+                logger.debug("Could not update viewer point size: %s", e)
+
+    def _on_display_density_changed(self, value):
+        """Handle display density slider change: re-slice the cached shuffled order."""
+        self.display_density = float(value)
+        self._schedule_display_rebuild()
+
+    def _on_display_voxel_changed(self, value):
+        """Handle display voxel slider change (0 falls back to the automatic size)."""
+        self.display_voxel = float(value)
+        self._schedule_display_rebuild()
+
+    def _on_full_resolution_checked(self, checked: bool):
+        """Handle full resolution toggle: bypass (or restore) display thinning."""
+        self.full_resolution = checked
+        self._schedule_display_rebuild()
+
+    def _schedule_display_rebuild(self):
+        """Debounce display slider drags: one rebuild with the latest values once they settle."""
+        if self._display_rebuild_timer is None:
+            self._display_rebuild_timer = threading.Timer(
+                config.DISPLAY_REBUILD_DEBOUNCE_SEC,
+                lambda: gui.Application.instance.post_to_main_thread(self.window, self._rebuild_display_pcd),
+            )
+            self._display_rebuild_timer.daemon = True
+            self._display_rebuild_timer.start()
+
+    def _display_settings(self):
+        """Slider state a display copy is built from (results built from other settings are stale)."""
+        return (self.display_density, self.display_voxel, self.full_resolution)
+
+    def _rebuild_display_pcd(self):
+        """Main thread: re-derive the display copy from the loaded cloud (no re-parse) on a worker."""
+        self._display_rebuild_timer = None
+        if self.current_pcd is None:
+            return
+        self._display_rebuild_seq += 1
+        seq = self._display_rebuild_seq
+        pcd = self.current_pcd
+        settings = self._display_settings()
+        if self.full_resolution:
+            self._apply_display_pcd(seq, pcd, settings, self._display_order, pcd)
+            return
+
+        count = self.current_pcd_meta["count"]
+        order = self._display_order
+        density = self.display_density
+        voxel = self.display_voxel or self.current_pcd_meta["auto_voxel"]
+
+        def worker():
+            display_order = order if order is not None else np.random.permutation(count)
+            try:
+                display = self._make_display_pcd(pcd, display_order, density, voxel)
+            except Exception as e:
+                logger.error("Display rebuild error: %s", e)
+                return
+            gui.Application.instance.post_to_main_thread(
+                self.window,
+                lambda: self._apply_display_pcd(seq, pcd, settings, display_order, display),
+            )
+
+        self._update_viz_status("Updating display...")
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _apply_display_pcd(self, seq: int, pcd, settings, order, display):
+        """Main thread: adopt a rebuilt display copy unless the cloud or sliders changed since."""
+        if (
+            seq != self._display_rebuild_seq
+            or pcd is not self.current_pcd
+            or settings != self._display_settings()
+        ):
+            logger.debug("Dropping stale display rebuild")
+            return
+        self._display_order = order
+        self.display_pcd = display
+        self._render_preview_key = None
+        self._update_viz_status(f"Display: {len(display.points)} of {len(pcd.points)} points")
+
+    @staticmethod
+    def _auto_voxel(count: int, bounds) -> float:
+        """Voxel size for clouds above config.MAX_DISPLAY_POINTS (bounds diagonal / divisor), else 0."""
+        if count <= config.MAX_DISPLAY_POINTS or bounds is None:
+            return 0.0
+        return float(np.linalg.norm(bounds[1] - bounds[0])) / config.DISPLAY_VOXEL_DIVISOR
+
+    @staticmethod
+    def _make_display_pcd(pcd, order, density: float, voxel: float = 0.0):
+        """
+        Uniformly thin a cloud by taking a prefix of a shuffled index order, then
+        optionally voxel-downsample it so dense regions are evened out.
+
+        The prefix is capped at config.MAX_DISPLAY_POINTS; returns pcd itself when
+        no thinning is needed.
+        """
+        count = len(pcd.points)
+        limit = min(config.MAX_DISPLAY_POINTS, int(np.ceil(count * density)))
+        display = pcd
+        if limit < count and order is not None:
+            idx = order[:limit]
+            display = o3d.geometry.PointCloud()
+            display.points = o3d.utility.Vector3dVector(np.asarray(pcd.points)[idx])
+            if pcd.has_colors():
+                display.colors = o3d.utility.Vector3dVector(np.asarray(pcd.colors)[idx])
+        if voxel > 0:
+            display = display.voxel_down_sample(voxel)
+        return display
 
     def _on_render_mode_normal_checked(self, checked: bool):
         """Keep render mode selection mutually exclusive."""
@@ -1006,20 +1272,19 @@ class RPLidarViewerApp:
             self.render_mode_distance_checkbox.checked = True
 
     def _clone_current_pcd(self):
-        """Return a copy of the current point cloud for non-destructive render styling."""
+        """Return a copy of the display point cloud for non-destructive render styling."""
+        source = self.display_pcd if self.display_pcd is not None else self.current_pcd
         pcd = o3d.geometry.PointCloud()
-        pts = np.asarray(self.current_pcd.points)
+        pts = np.asarray(source.points)
         pcd.points = o3d.utility.Vector3dVector(np.array(pts, copy=True))
-        if self.current_pcd.has_colors():
-            colors = np.asarray(self.current_pcd.colors)
+        if source.has_colors():
+            colors = np.asarray(source.colors)
             pcd.colors = o3d.utility.Vector3dVector(np.array(colors, copy=True))
         return pcd
 
     def _apply_normal_colors(self, pcd: o3d.geometry.PointCloud):
-        """Apply default red coloring."""
-        pts = np.asarray(pcd.points)
-        colors = np.tile([1.0, 0.0, 0.0], (len(pts), 1))
-        pcd.colors = o3d.utility.Vector3dVector(colors)
+        """Apply default red coloring (filled in place by Open3D, no N x 3 temporary)."""
+        pcd.paint_uniform_color([1.0, 0.0, 0.0])
 
     def _apply_distance_colors(self, pcd: o3d.geometry.PointCloud):
         """Color points by distance magnitude using a simple blue->red gradient."""
@@ -1132,12 +1397,13 @@ class RPLidarViewerApp:
 
     def _build_render_pcd(self):
         """Build point cloud styled according to selected render mode."""
-        pcd = self._clone_current_pcd()
-
+        source = self.display_pcd if self.display_pcd is not None else self.current_pcd
         if self.render_mode == "normal":
-            if not pcd.has_colors():
-                self._apply_normal_colors(pcd)
-            return pcd
+            # Nothing to restyle: the float32 handoff in _on_visualize is already a
+            # copy, and clouds without colors are drawn red by the viewer side.
+            return source
+
+        pcd = self._clone_current_pcd()
 
         if self.render_mode == "distance":
             self._apply_distance_colors(pcd)
@@ -1154,137 +1420,373 @@ class RPLidarViewerApp:
         return pcd
     
     def load_and_display_file(self, file_path: str):
-        """Load a point cloud file."""
-        print(f"[DEBUG] load_and_display_file called with: {file_path}")
-        if not os.path.exists(file_path):
-            print(f"[DEBUG] File not found: {file_path}")
+        """Load a point cloud file (parsing runs on a worker thread)."""
+        logger.debug("load_and_display_file called with: %s", file_path)
+        # One stat serves as both the existence check and the change check
+        try:
+            mtime = os.stat(file_path).st_mtime
+        except OSError:
+            logger.debug("File not found: %s", file_path)
             self._update_viz_status(f"Error: File not found: {file_path}")
             return
-        
-        print("[DEBUG] Loading file...")
-        pcd = self.loader.load_file(file_path)
-        print(f"[DEBUG] File loaded, pcd is None: {pcd is None}")
-        
-        if pcd is not None:
-            # Validate geometry
-            if len(pcd.points) == 0:
-                print("[DEBUG] ERROR: Point cloud is empty!")
-                self._update_viz_status("Error: Empty point cloud")
-                return
-            
-            # Add bright colors if missing
-            if not pcd.has_colors():
-                print("[DEBUG] Adding default red colors...")
-                colors = np.tile([1.0, 0.0, 0.0], (len(pcd.points), 1))
-                pcd.colors = o3d.utility.Vector3dVector(colors)
-            
-            # Store the loaded point cloud
-            self.current_pcd = pcd
-            self.current_file = file_path
-            
-            # Update info label
-            count = self.loader.get_point_count()
-            bounds_tuple = self.loader.get_bounds()
-            
-            filename = os.path.basename(file_path)
-            if bounds_tuple:
-                min_b, max_b = bounds_tuple
-                info_text = (f"File: {filename} | Points: {count} | "
-                           f"X[{min_b[0]:.2f}, {max_b[0]:.2f}] "
-                           f"Y[{min_b[1]:.2f}, {max_b[1]:.2f}] "
-                           f"Z[{min_b[2]:.2f}, {max_b[2]:.2f}]")
-            else:
-                info_text = f"File: {filename} | Points: {count}"
-            
-            self._update_info_label(info_text)
-            self._update_viz_status(f"Loaded: {filename}")
-            
-            # Enable visualize and save buttons
-            self.visualize_btn.enabled = True
-            self.save_ply_btn.enabled = True
-            
-            print("[DEBUG] Load complete - click 'Visualize' to view")
-        else:
+
+        # Re-notifications for an unchanged file don't need a full re-parse.
+        if (self.current_pcd is not None and file_path == self.current_file
+                and mtime == self._current_mtime):
+            logger.debug("File unchanged since last load, skipping reload")
+            self._update_viz_status(f"Already loaded: {os.path.basename(file_path)}")
+            return
+
+        if self._loading:
+            logger.debug("A load is already in progress, ignoring")
+            return
+
+        self._loading = True
+        if getattr(self, "load_btn", None) is not None:
+            self.load_btn.enabled = False
+        self._update_viz_status(f"Loading {os.path.basename(file_path)}...")
+
+        worker = threading.Thread(
+            target=self._load_file_worker,
+            args=(file_path, mtime),
+            daemon=True,
+        )
+        worker.start()
+
+    def _load_file_worker(self, file_path: str, mtime: float):
+        """Worker thread: parse the file and prepare the display copy."""
+        logger.debug("Loading file...")
+        pcd = None
+        display_pcd = None
+        display_order = None
+        bounds = None
+        try:
+            pcd = self.loader.load_file(file_path)
+            logger.debug("File loaded, pcd is None: %s", pcd is None)
+
+            if pcd is not None and len(pcd.points) > 0:
+                # Colorless clouds stay colorless here: both viewer handoffs
+                # (shared memory and preview PLY) fall back to red points.
+
+                # Bounds come from the loader's NumPy min/max, computed off the GUI thread
+                bounds = self.loader.current_bounds
+
+                # Huge clouds (or a reduced density) are rendered from a shuffled-prefix
+                # subset, voxel-downsampled (auto-sized for huge clouds unless set);
+                # the full cloud is kept for saving and for the info-label bounds.
+                count = len(pcd.points)
+                if self.full_resolution:
+                    display_pcd = pcd
+                else:
+                    if count > config.MAX_DISPLAY_POINTS or self.display_density < 1.0:
+                        display_order = np.random.permutation(count)
+                    voxel = self.display_voxel or self._auto_voxel(count, bounds)
+                    display_pcd = self._make_display_pcd(pcd, display_order, self.display_density, voxel)
+                if display_pcd is not pcd:
+                    logger.debug("Display copy reduced to %s points", len(display_pcd.points))
+        except Exception as e:
+            logger.error("Load error: %s", e)
+            pcd = None
+
+        gui.Application.instance.post_to_main_thread(
+            self.window,
+            lambda: self._finish_load(file_path, mtime, pcd, display_pcd, display_order, bounds),
+        )
+
+    def _finish_load(self, file_path: str, mtime: float, pcd, display_pcd, display_order=None, bounds=None):
+        """Main thread: adopt the loaded cloud and refresh the labels/buttons."""
+        self._loading = False
+        if getattr(self, "load_btn", None) is not None:
+            self.load_btn.enabled = True
+
+        if pcd is None:
             self._update_viz_status(f"Failed to load: {file_path}")
+            return
+
+        # Validate geometry
+        if len(pcd.points) == 0:
+            logger.error("Point cloud is empty!")
+            self._update_viz_status("Error: Empty point cloud")
+            return
+
+        # Store the loaded point cloud (display rebuilds still in flight are now stale)
+        self._display_rebuild_seq += 1
+        self.current_pcd = pcd
+        self.display_pcd = display_pcd
+        self._display_order = display_order
+        self.current_file = file_path
+        self._current_mtime = mtime
+        count = len(pcd.points)
+        self.current_pcd_meta = {
+            "count": count,
+            "min_bound": bounds[0] if bounds is not None else None,
+            "max_bound": bounds[1] if bounds is not None else None,
+            "auto_voxel": self._auto_voxel(count, bounds),
+        }
+
+        # Update info label
+        filename = os.path.basename(file_path)
+        points_text = f"Points: {count}"
+        if display_pcd is not None and display_pcd is not pcd:
+            points_text += f" (displaying {len(display_pcd.points)})"
+        if bounds is not None:
+            min_b, max_b = bounds
+            extent = max_b - min_b
+            info_text = (f"File: {filename} | {points_text} | "
+                       f"X[{min_b[0]:.2f}, {max_b[0]:.2f}] "
+                       f"Y[{min_b[1]:.2f}, {max_b[1]:.2f}] "
+                       f"Z[{min_b[2]:.2f}, {max_b[2]:.2f}] | "
+                       f"Size {extent[0]:.2f} x {extent[1]:.2f} x {extent[2]:.2f} m")
+        else:
+            info_text = f"File: {filename} | {points_text}"
+
+        self._update_info_label(info_text)
+        self._update_viz_status(f"Loaded: {filename}")
+
+        # Enable visualize and save buttons
+        self.visualize_btn.enabled = True
+        self.save_ply_btn.enabled = True
+
+        logger.debug("Load complete - click 'Visualize' to view")
     
     def _on_visualize(self):
         """Open the point cloud in a classic viewer window via subprocess."""
-        print("[DEBUG] Visualize button clicked")
+        logger.debug("Visualize button clicked")
         
-        if not self.current_file or not os.path.exists(self.current_file):
-            print("[DEBUG] No valid file loaded")
+        # current_pcd is only set by a successful load; no need to re-stat the file
+        if self.current_pcd is None:
+            logger.debug("No valid file loaded")
             self._update_viz_status("Error: No point cloud loaded")
             return
         
         try:
-            render_pcd = self._build_render_pcd()
-            if render_pcd is None:
-                return
-
-            os.makedirs(os.path.dirname(self.render_preview_file), exist_ok=True)
-            if not o3d.io.write_point_cloud(self.render_preview_file, render_pcd):
-                self._update_viz_status("Error: failed to build render preview")
-                return
+            # Point size is only a viewer argument: when geometry and coloring are
+            # unchanged, reuse the preview already handed over instead of rebuilding it.
+            preview_key = (self.current_file, self._current_mtime, self.render_mode)
+            reuse_preview = (
+                self.render_mode != "panorama"
+                and preview_key == self._render_preview_key
+                and (self._render_shm_spec is not None or os.path.exists(self.render_preview_file))
+            )
 
-            # Launch standalone viewer as subprocess (prevents GLFW conflicts)
-            viewer_script = os.path.join(os.path.dirname(__file__), 'standalone_viewer.py')
-            python_exe = sys.executable
-            
-            # Build command
-            cmd = [python_exe, viewer_script, self.render_preview_file, str(int(self.point_size))]
+            if not reuse_preview:
+                self._render_preview_key = None
+                render_pcd = self._build_render_pcd()
+                if render_pcd is None:
+                    return
+
+                # Hand the viewer the points in shared memory; write the preview file
+                # only if no shared-memory block can be created.
+                if not self._publish_render_shm(render_pcd):
+                    os.makedirs(os.path.dirname(self.render_preview_file), exist_ok=True)
+                    # Hand the viewer float32 buffers (what the renderer consumes) instead of float64.
+                    render_tpcd = o3d.t.geometry.PointCloud.from_legacy(render_pcd, o3d.core.float32)
+                    if not o3d.t.io.write_point_cloud(self.render_preview_file, render_tpcd):
+                        self._update_viz_status("Error: failed to build render preview")
+                        return
+                if self.render_mode != "panorama":
+                    self._render_preview_key = preview_key
+
+            # Viewer request (same arguments as the standalone_viewer.py command line)
+            args = [self.render_preview_file, str(int(self.point_size))]
+            if self._render_shm_spec is not None:
+                args += ["--shm", self._render_shm_spec]
+            if self.current_file:
+                args += ["--source", self.current_file]
+                # Source already viewed this session: reopen at the camera the user left it at
+                if self.current_file in self._viewed_files:
+                    args.append("--restore-view")
+                self._viewed_files.add(self.current_file)
             
-            print(f"[DEBUG] Launching viewer subprocess: {' '.join(cmd)}")
-            
-            # Use Popen to launch non-blocking subprocess
-            subprocess.Popen(
-                cmd,
-                creationflags=subprocess.CREATE_NEW_CONSOLE if sys.platform == 'win32' else 0
-            )
+            logger.debug("Sending viewer request: %s", args)
+            self._send_viewer_request(args)
             
             self._update_viz_status("Viewer window opened")
-            print("[DEBUG] Viewer subprocess launched")
+            logger.debug("Viewer request sent")
             
         except Exception as e:
-            print(f"[DEBUG] Viewer error: {e}")
-            import traceback
+            logger.error("Viewer error: %s", e)
             traceback.print_exc()
             self._update_viz_status(f"Error: {str(e)}")
     
+    def _ensure_viewer_proc(self):
+        """Start the standalone viewer in --daemon mode unless it is already running."""
+        if self._viewer_proc is not None and self._viewer_proc.poll() is None:
+            return self._viewer_proc
+        # Separate process (prevents GLFW conflicts with this GUI)
+        viewer_script = os.path.join(os.path.dirname(__file__), 'standalone_viewer.py')
+        self._viewer_proc = subprocess.Popen(
+            [sys.executable, viewer_script, "--daemon"],
+            stdin=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+            creationflags=subprocess.CREATE_NEW_CONSOLE if sys.platform == 'win32' else 0
+        )
+        return self._viewer_proc
+
+    def _stop_viewer_proc(self, timeout: float):
+        """Ask the viewer process to exit (stdin EOF), terminating then killing it if it hangs."""
+        proc = self._viewer_proc
+        self._viewer_proc = None
+        if proc is None or proc.poll() is not None:
+            return
+        try:
+            proc.stdin.close()  # EOF: the viewer closes its window and exits
+        except OSError:
+            pass
+        for stop in (proc.terminate, proc.kill):
+            try:
+                proc.wait(timeout=timeout)
+                return
+            except subprocess.TimeoutExpired:
+                logger.debug("Viewer process still running, calling %s()", stop.__name__)
+                stop()
+        try:
+            proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            logger.warning("Viewer process %s did not exit", proc.pid)
+
+    def _send_viewer_request(self, args: list):
+        """Send one request line to the viewer process, restarting it once if it has gone away."""
+        line = json.dumps(args) + "\n"
+        for attempt in range(2):
+            proc = self._ensure_viewer_proc()  # respawns if poll() shows the daemon exited
+            try:
+                proc.stdin.write(line)
+                proc.stdin.flush()
+                return
+            except (BrokenPipeError, OSError, ValueError) as e:
+                # Daemon died between poll() and the write (or its stdin is closed)
+                if attempt:
+                    raise
+                logger.warning("Viewer process not accepting requests (%s, exit code %s); restarting",
+                               e, proc.poll())
+                self._viewer_proc = None
+
+    def _publish_render_shm(self, render_pcd) -> bool:
+        """
+        Copy the render cloud into a fresh shared-memory block for the viewer subprocess.
+        
+        The block holds N x 6 float32 followed by one ack byte the viewer sets once it
+        has copied the points out. The previous block is retired, not unlinked: the
+        viewer may not have attached to it yet.
+        
+        Returns False (no block held) if shared memory is unavailable.
+        """
+        self._retire_render_shm()
+        points = np.asarray(render_pcd.points)
+        count = len(points)
+        try:
+            shm = shared_memory.SharedMemory(create=True, size=count * 6 * 4 + 1)
+        except OSError as e:
+            logger.warning("Shared memory unavailable, using preview file: %s", e)
+            return False
+
+        packed = np.ndarray((count, 6), dtype=np.float32, buffer=shm.buf)
+        packed[:, :3] = points
+        if render_pcd.has_colors():
+            packed[:, 3:] = np.asarray(render_pcd.colors)
+        else:
+            packed[:, 3:] = (1.0, 0.0, 0.0)
+        del packed  # drop the buffer export so the block can be closed later
+        shm.buf[count * 6 * 4] = 0  # ack byte, set by the viewer
+
+        self._render_shm = shm
+        self._render_shm_spec = f"{shm.name}:{count}"
+        return True
+
+    @staticmethod
+    def _render_shm_acked(shm, count: int) -> bool:
+        """True once the viewer has copied the points out of this block."""
+        try:
+            return shm.buf[count * 6 * 4] != 0
+        except (TypeError, ValueError, IndexError):
+            return True  # already closed
+
+    def _retire_render_shm(self):
+        """Stop handing out the current block; it is unlinked once the viewer has moved past it."""
+        if self._render_shm is not None:
+            count = int(self._render_shm_spec.rsplit(":", 1)[1])
+            self._retired_shms.append((self._render_shm, count))
+        self._render_shm = None
+        self._render_shm_spec = None
+        self._reap_render_shms()
+
+    def _reap_render_shms(self):
+        """
+        Unlink retired blocks the viewer is done with.
+        
+        Requests are served in order, so a block is done once it, or any block
+        published after it, has been acknowledged.
+        """
+        blocks = list(self._retired_shms)
+        if self._render_shm is not None:
+            blocks.append((self._render_shm, int(self._render_shm_spec.rsplit(":", 1)[1])))
+        last_acked = max(
+            (i for i, (shm, count) in enumerate(blocks) if self._render_shm_acked(shm, count)),
+            default=-1,
+        )
+        keep = []
+        for i, (shm, count) in enumerate(self._retired_shms):
+            if i <= last_acked:
+                self._unlink_shm(shm)
+            else:
+                keep.append((shm, count))
+        self._retired_shms = keep
+
+    @staticmethod
+    def _unlink_shm(shm):
+        try:
+            shm.close()
+            shm.unlink()
+        except OSError:
+            pass
+
+    def _release_render_shm(self):
+        """Close and unlink every render preview block (current and retired); call once the viewer is gone."""
+        shm = self._render_shm
+        self._render_shm = None
+        self._render_shm_spec = None
+        if shm is not None:
+            self._unlink_shm(shm)
+        for retired, _ in self._retired_shms:
+            self._unlink_shm(retired)
+        self._retired_shms = []
+
     def _update_info_label(self, text: str):
         """Update the info label."""
-        print(f"[DEBUG] Updating info label: {text}")
+        logger.debug("Updating info label: %s", text)
         if self.info_label:
             self.info_label.text = text
         else:
-            print("[DEBUG] Warning: info_label is None")
+            logger.warning("info_label is None")
     
     def _update_viz_status(self, message: str):
         """Update the visualization status label."""
-        print(f"[DEBUG] Updating viz status: {message}")
+        logger.debug("Updating viz status: %s", message)
         if self.viz_status_label:
             self.viz_status_label.text = f"Status: {message}"
         else:
-            print("[DEBUG] Warning: viz_status_label is None")
+            logger.warning("viz_status_label is None")
     
     def run(self, initial_file: str = None):
         """Run the application."""
-        print("[DEBUG] Starting application...")
+        logger.debug("Starting application...")
         # Initialize GUI
         self.initialize_gui()
-        print("[DEBUG] GUI initialized")
+        logger.debug("GUI initialized")
         
         # Don't auto-load files - let user manually load via the Load button
         if initial_file:
             print(f"[INFO] To view {initial_file}, switch to Visualization tab and click 'Load File...'")
         
         # Run the application
-        print("[DEBUG] Starting GUI main loop...")
+        logger.debug("Starting GUI main loop...")
         try:
             gui.Application.instance.run()
-            print("[DEBUG] GUI main loop ended normally")
+            logger.debug("GUI main loop ended normally")
         except Exception as e:
             print(f"[ERROR] GUI main loop error: {e}")
-            import traceback
             traceback.print_exc()
             raise
 
@@ -1295,8 +1797,15 @@ def main():
     
     parser = argparse.ArgumentParser(description="RPLidar Scanner & Viewer")
     parser.add_argument("file", nargs="?", help="Point cloud file to load on startup")
+    parser.add_argument("--debug", action="store_true", help="Enable [DEBUG] tracing (same as RPLIDAR_DEBUG=1)")
     
     args = parser.parse_args()
+
+    # Debug tracing is off unless --debug or RPLIDAR_DEBUG is set (RPLIDAR_LOG picks another level)
+    logging.basicConfig(
+        level=logging.DEBUG if args.debug or config.DEBUG else config.LOG_LEVEL,
+        format="[%(levelname)s] %(message)s",
+    )
     
     # Create and run app
     app = RPLidarViewerApp()
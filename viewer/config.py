@@ -41,6 +41,10 @@ PANORAMA_REAR_RELATIVE_YAW_DEG = 180.0
 PANORAMA_COLORIZE_AUTO_YAW = False
 PANORAMA_COLORIZE_YAW_OFFSET_DEG = 60.0
 
+# Logging
+DEBUG = os.environ.get("RPLIDAR_DEBUG", "0") not in ("", "0")  # RPLIDAR_DEBUG=1 enables [DEBUG] tracing
+LOG_LEVEL = os.environ.get("RPLIDAR_LOG", "INFO").upper()  # Console log level when DEBUG is off
+
 # Visualization Settings
 POINT_SIZE = 2.0
 BACKGROUND_COLOR = [0.1, 0.1, 0.1, 1.0]  # Dark gray (RGBA)
@@ -48,6 +52,18 @@ POINT_COLOR_DEFAULT = [0.0, 0.8, 1.0]  # Cyan
 WINDOW_NAME = "RPLidar 3D Point Cloud Viewer"
 WINDOW_WIDTH = 1280
 WINDOW_HEIGHT = 720
+MAX_DISPLAY_POINTS = 2_000_000  # Show at most this many points (random subset above it)
+DISPLAY_VOXEL_DIVISOR = 1000  # Auto display voxel for huge clouds = bounds diagonal / this
+DISPLAY_VOXEL_MAX = 0.1  # Upper limit (m) of the display voxel slider
+PCD_CACHE_MAX_BYTES = 200 * 1024 * 1024  # Parsed point-cloud cache budget
+PCD_DISK_CACHE_DIR = os.path.join(DATA_DIR, ".pcd_cache")  # Parsed CSV clouds saved as .npy, viewer camera poses as .json
+PCD_DISK_CACHE_MIN_BYTES = 1024 * 1024  # Smaller CSV files are simply re-parsed
+PLY_MMAP_MIN_BYTES = 64 * 1024 * 1024  # Binary PLY vertex blocks this large are read via mmap
+PLY_READ_CHUNK_POINTS = 1 << 20  # Vertices converted per chunk when reading binary PLY
+POINT_SIZE_DEBOUNCE_SEC = 0.1  # Point-size slider changes within this window reach the viewer once
+DISPLAY_REBUILD_DEBOUNCE_SEC = 0.15  # Density/voxel slider changes within this window trigger one rebuild
+VIEWER_CLOSE_GRACE_SEC = 0.5  # On GUI close, wait this long for the viewer to exit before killing it
+NATIVE_FILE_DIALOG = False  # Load File uses Open3D's gui.FileDialog instead of Tk (can hang on some platforms)
 
 # Scan Scripts
 SCRIPT_2D_SCAN = os.path.join(BASE_DIR, "dump_one_scan.py")
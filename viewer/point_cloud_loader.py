@@ -6,10 +6,106 @@ Handles loading and processing of CSV and PLY scan files for visualization.
 
 import os
 import csv
+import glob
+import hashlib
+import mmap
+import threading
+from collections import OrderedDict
 import numpy as np
 import open3d as o3d
 from typing import Optional, Tuple
 from . import config
+from ._fastcsv import parse_csv_columns
+
+try:
+    from numba import njit, prange
+except ImportError:  # Optional: pip install numba
+    njit = None
+
+JIT_COLOR_MIN_POINTS = 100_000  # Below this, the NumPy colormap beats the parallel kernel's startup
+
+
+# PLY scalar type names -> little-endian NumPy dtypes
+_PLY_DTYPES = {
+    "char": "i1", "int8": "i1",
+    "uchar": "u1", "uint8": "u1",
+    "short": "<i2", "int16": "<i2",
+    "ushort": "<u2", "uint16": "<u2",
+    "int": "<i4", "int32": "<i4",
+    "uint": "<u4", "uint32": "<u4",
+    "float": "<f4", "float32": "<f4",
+    "double": "<f8", "float64": "<f8",
+}
+
+
+def _parse_binary_ply_header(f):
+    """
+    Parse a PLY header and describe its vertex block if it can be read directly.
+    
+    Returns:
+        (vertex_dtype, vertex_count, body_offset) for a binary little-endian file whose
+        first element is a list-free 'vertex' element, otherwise None.
+    """
+    if f.readline().strip() != b"ply":
+        return None
+    
+    fmt = None
+    elements = []  # [name, count, [(prop, dtype)]]
+    while True:
+        line = f.readline()
+        if not line:
+            return None
+        parts = line.split()
+        if not parts:
+            continue
+        keyword = parts[0]
+        if keyword == b"end_header":
+            break
+        if keyword == b"format":
+            fmt = parts[1]
+        elif keyword == b"element":
+            elements.append([parts[1], int(parts[2]), []])
+        elif keyword == b"property":
+            if not elements or parts[1] == b"list":
+                return None
+            dtype = _PLY_DTYPES.get(parts[1].decode("ascii", "replace"))
+            if dtype is None:
+                return None
+            elements[-1][2].append((parts[2].decode("ascii", "replace"), dtype))
+    
+    if fmt != b"binary_little_endian" or not elements or elements[0][0] != b"vertex":
+        return None
+    
+    _, count, props = elements[0]
+    return np.dtype(props), count, f.tell()
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _bounds_jit(points):
+        """Per-axis min/max of an Nx3 array in one pass (NaN rows never win a comparison)."""
+        lo = np.full(3, np.inf)
+        hi = np.full(3, -np.inf)
+        for i in range(points.shape[0]):
+            for k in range(3):
+                v = points[i, k]
+                if v < lo[k]:
+                    lo[k] = v
+                if v > hi[k]:
+                    hi[k] = v
+        return lo, hi
+
+    @njit(cache=True, parallel=True)
+    def _height_colors_jit(z, z_min, scale, out):
+        """Blue -> red height colormap of z into out (N x 3), one fused pass per point."""
+        for i in prange(z.shape[0]):
+            t = (z[i] - z_min) * scale
+            out[i, 0] = t
+            out[i, 1] = 1.0 - abs(t - 0.5) * 2.0
+            out[i, 2] = 1.0 - t
+else:
+    _bounds_jit = None
+    _height_colors_jit = None
 
 
 class PointCloudLoader:
@@ -23,11 +119,77 @@ class PointCloudLoader:
         """Initialize the point cloud loader."""
         self.current_pcd: Optional[o3d.geometry.PointCloud] = None
         self.current_file: Optional[str] = None
+        self.current_bounds: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self.current_points: Optional[np.ndarray] = None  # Nx3 view of current_pcd.points
         self.scan_type: Optional[str] = None
+        
+        # LRU of parsed clouds: (path, mtime, size) -> (pcd, nbytes)
+        self._cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._cache_bytes = 0
+        # Serializes parsing so a background prefetch and a load of the same file share one parse
+        self._lock = threading.RLock()
+    
+    @staticmethod
+    def _cache_key(file_path: str) -> tuple:
+        st = os.stat(file_path)
+        return (os.path.abspath(file_path), st.st_mtime_ns, st.st_size)
+    
+    def _cache_get(self, key: tuple) -> Optional[tuple]:
+        """Return (pcd, bounds) for a cached parse, or None."""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        self._cache.move_to_end(key)
+        return entry[0], entry[2]
+    
+    def _cache_put(self, key: tuple, pcd: o3d.geometry.PointCloud, bounds):
+        # points + colors, float64 xyz each
+        nbytes = len(pcd.points) * 3 * 8 * (2 if pcd.has_colors() else 1)
+        if nbytes > config.PCD_CACHE_MAX_BYTES:
+            return
+        old = self._cache.pop(key, None)
+        if old is not None:
+            self._cache_bytes -= old[1]
+        self._cache[key] = (pcd, nbytes, bounds)
+        self._cache_bytes += nbytes
+        while self._cache_bytes > config.PCD_CACHE_MAX_BYTES:
+            _, (_, evicted, _) = self._cache.popitem(last=False)
+            self._cache_bytes -= evicted
+    
+    @staticmethod
+    def _compute_bounds(points: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        if not len(points):
+            return None
+        if _bounds_jit is not None:
+            return _bounds_jit(points)  # min and max fused into a single pass
+        return points.min(axis=0), points.max(axis=0)
+    
+    def _set_current(self, pcd: o3d.geometry.PointCloud, file_path: str, bounds=None):
+        """Record the loaded cloud and its bounds (computed here unless already known)."""
+        points = np.asarray(pcd.points)
+        self.current_pcd = pcd
+        self.current_points = points
+        self.current_file = file_path
+        self.current_bounds = bounds if bounds is not None else self._compute_bounds(points)
     
     def load_csv(self, file_path: str) -> Optional[o3d.geometry.PointCloud]:
         """
-        Load point cloud from CSV file.
+        Load point cloud from CSV file and make it the current cloud.
+        
+        Args:
+            file_path: Path to CSV file
+            
+        Returns:
+            Open3D PointCloud object or None if load failed
+        """
+        pcd = self._read_csv(file_path)
+        if pcd is not None:
+            self._set_current(pcd, file_path)
+        return pcd
+    
+    def _read_csv(self, file_path: str) -> Optional[o3d.geometry.PointCloud]:
+        """
+        Parse a CSV scan file without touching the current-cloud state.
         
         Args:
             file_path: Path to CSV file
@@ -40,34 +202,51 @@ class PointCloudLoader:
             return None
         
         try:
-            points = []
-            
-            with open(file_path, 'r') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    x = float(row['x_m'])
-                    y = float(row['y_m'])
-                    # Handle both z_m (2D/3D cartesian) and z_deg (legacy format)
-                    z = float(row.get('z_m', row.get('z_deg', 0.0)))
-                    points.append([x, y, z])
-            
-            if not points:
+            with open(file_path, 'r', newline='') as f:
+                header = next(csv.reader(f), [])
+            columns = {name.strip(): i for i, name in enumerate(header)}
+            
+            # Scan files use x_m/y_m/z_m; plain x/y/z headers are accepted too
+            x_col = columns.get('x_m', columns.get('x'))
+            y_col = columns.get('y_m', columns.get('y'))
+            if x_col is None or y_col is None:
+                print(f"CSV file has no x_m/y_m columns: {file_path}")
+                return None
+            # Handle both z_m (2D/3D cartesian) and z_deg (legacy format)
+            z_col = columns.get('z_m', columns.get('z_deg', columns.get('z')))
+            # 2D scan layout (dump_one_scan: polar samples plus x/y/z): z_m is always 0,
+            # so neither parse it nor scan it for coloring
+            if 'angle_deg' in columns and 'distance_mm' in columns:
+                z_col = None
+            usecols = (x_col, y_col) if z_col is None else (x_col, y_col, z_col)
+            
+            # Compiled byte-level parse when numba is available, else one vectorized loadtxt
+            data = parse_csv_columns(file_path, usecols)
+            if data is None:
+                data = np.loadtxt(file_path, delimiter=',', skiprows=1, usecols=usecols,
+                                  dtype=np.float64, ndmin=2)
+            
+            if len(data) == 0:
                 print(f"No points found in CSV file: {file_path}")
                 return None
             
+            if z_col is None:
+                points = np.zeros((len(data), 3), dtype=np.float64)
+                points[:, :2] = data
+            else:
+                points = data
+            
             # Create Open3D point cloud
             pcd = o3d.geometry.PointCloud()
-            pcd.points = o3d.utility.Vector3dVector(np.array(points))
+            pcd.points = o3d.utility.Vector3dVector(points)
             
-            # Color points based on height (z-value) or default color
-            colors = self._generate_colors(np.array(points))
+            # Color points based on height (z-value) or default color; 2D scans and
+            # files without a z column are flat, so skip the z range scan
+            colors = self._generate_colors(points, assume_flat=z_col is None)
             pcd.colors = o3d.utility.Vector3dVector(colors)
             
             print(f"Loaded {len(points)} points from CSV: {file_path}")
             
-            self.current_pcd = pcd
-            self.current_file = file_path
-            
             return pcd
             
         except Exception as e:
@@ -76,7 +255,22 @@ class PointCloudLoader:
     
     def load_ply(self, file_path: str) -> Optional[o3d.geometry.PointCloud]:
         """
-        Load point cloud from PLY file.
+        Load point cloud from PLY file and make it the current cloud.
+        
+        Args:
+            file_path: Path to PLY file
+            
+        Returns:
+            Open3D PointCloud object or None if load failed
+        """
+        pcd = self._read_ply(file_path)
+        if pcd is not None:
+            self._set_current(pcd, file_path)
+        return pcd
+    
+    def _read_ply(self, file_path: str) -> Optional[o3d.geometry.PointCloud]:
+        """
+        Parse a PLY file without touching the current-cloud state.
         
         Args:
             file_path: Path to PLY file
@@ -89,7 +283,9 @@ class PointCloudLoader:
             return None
         
         try:
-            pcd = o3d.io.read_point_cloud(file_path)
+            pcd = self._load_binary_ply_direct(file_path)
+            if pcd is None:
+                pcd = o3d.io.read_point_cloud(file_path)
             
             if pcd.is_empty():
                 print(f"PLY file is empty: {file_path}")
@@ -103,15 +299,84 @@ class PointCloudLoader:
             
             print(f"Loaded {len(pcd.points)} points from PLY: {file_path}")
             
-            self.current_pcd = pcd
-            self.current_file = file_path
-            
             return pcd
             
         except Exception as e:
             print(f"Error loading PLY file: {e}")
             return None
     
+    def _load_binary_ply_direct(self, file_path: str) -> Optional[o3d.geometry.PointCloud]:
+        """
+        Fast path for binary little-endian PLY: read the vertex block straight into NumPy.
+        
+        The vertex block is streamed in chunks of config.PLY_READ_CHUNK_POINTS into
+        preallocated point/color arrays, so peak memory is the result plus one chunk.
+        Large blocks are sliced from an mmap view; smaller ones are read with np.fromfile.
+        
+        Returns None (caller falls back to Open3D's reader) for ASCII/big-endian files,
+        list properties, layouts without x/y/z, or a truncated body.
+        """
+        with open(file_path, "rb") as f:
+            header = _parse_binary_ply_header(f)
+            if header is None:
+                return None
+            vertex_dtype, count, offset = header
+            if not {"x", "y", "z"}.issubset(vertex_dtype.names):
+                return None
+            if count == 0:
+                return o3d.geometry.PointCloud()
+            
+            body_bytes = count * vertex_dtype.itemsize
+            if offset + body_bytes > os.fstat(f.fileno()).st_size:
+                return None  # Truncated body; let Open3D report it
+            
+            chunk = max(1, config.PLY_READ_CHUNK_POINTS)
+            starts = range(0, count, chunk)
+            if body_bytes >= config.PLY_MMAP_MIN_BYTES:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    vertices = np.frombuffer(mm, dtype=vertex_dtype, count=count, offset=offset)
+                    try:
+                        return self._cloud_from_vertex_chunks(
+                            (vertices[i:i + chunk] for i in starts), vertex_dtype, count
+                        )
+                    finally:
+                        del vertices  # Release the buffer export before the mmap closes
+            
+            f.seek(offset)
+            return self._cloud_from_vertex_chunks(
+                (np.fromfile(f, dtype=vertex_dtype, count=min(chunk, count - i)) for i in starts),
+                vertex_dtype, count,
+            )
+    
+    @staticmethod
+    def _cloud_from_vertex_chunks(chunks, vertex_dtype: np.dtype, count: int) -> o3d.geometry.PointCloud:
+        """Copy x/y/z (and red/green/blue, if present) from structured vertex chunks into one cloud."""
+        points = np.empty((count, 3), dtype=np.float64)
+        colors = None
+        if {"red", "green", "blue"}.issubset(vertex_dtype.names):
+            colors = np.empty((count, 3), dtype=np.float64)
+        
+        start = 0
+        for vertices in chunks:
+            stop = start + len(vertices)
+            points[start:stop, 0] = vertices["x"]
+            points[start:stop, 1] = vertices["y"]
+            points[start:stop, 2] = vertices["z"]
+            if colors is not None:
+                colors[start:stop, 0] = vertices["red"]
+                colors[start:stop, 1] = vertices["green"]
+                colors[start:stop, 2] = vertices["blue"]
+            start = stop
+        
+        if colors is not None and vertex_dtype["red"].kind in "ui":
+            colors /= 255.0
+        
+        pcd = o3d.geometry.PointCloud()
+        pcd.points = o3d.utility.Vector3dVector(points)
+        if colors is not None:
+            pcd.colors = o3d.utility.Vector3dVector(colors)
+        return pcd
+    
     def load_scan(self, scan_type: str = "2d", file_format: str = "ply") -> Optional[o3d.geometry.PointCloud]:
         """
         Load the appropriate scan file based on type.
@@ -151,19 +416,96 @@ class PointCloudLoader:
         Returns:
             Open3D PointCloud object or None if load failed
         """
-        if not os.path.exists(file_path):
-            print(f"File not found: {file_path}")
-            return None
+        # The cache-key stat doubles as the existence check
+        with self._lock:
+            try:
+                pcd, bounds = self._read_cached(file_path)
+            except FileNotFoundError:
+                print(f"File not found: {file_path}")
+                return None
+        if pcd is not None:
+            self._set_current(pcd, file_path, bounds)
+        return pcd
+    
+    def prefetch(self, file_path: str):
+        """
+        Parse a file into the cache ahead of a load_file() call (safe to run on a worker thread).
+        
+        The current cloud is left untouched; a later load_file() of the same, unchanged
+        file is served from the cache, or waits for this parse to finish.
+        """
+        with self._lock:
+            try:
+                self._read_cached(file_path)
+            except FileNotFoundError:
+                pass
+    
+    def _read_cached(self, file_path: str) -> tuple:
+        """
+        Return (pcd, bounds) for file_path from the cache, parsing it on a miss.
         
+        Bounds are computed once per parse, so cache hits never rescan the points.
+        """
         ext = os.path.splitext(file_path)[1].lower()
         
+        key = self._cache_key(file_path)
+        entry = self._cache_get(key)
+        if entry is not None:
+            return entry
+        
         if ext == ".ply":
-            return self.load_ply(file_path)
+            pcd = self._read_ply(file_path)
         elif ext == ".csv":
-            return self.load_csv(file_path)
+            pcd = self._disk_cache_load(key)
+            if pcd is None:
+                pcd = self._read_csv(file_path)
+                if pcd is not None and key[2] >= config.PCD_DISK_CACHE_MIN_BYTES:
+                    self._disk_cache_save(key, pcd)
         else:
             print(f"Unsupported file format: {ext}")
+            return None, None
+        
+        if pcd is None:
+            return None, None
+        bounds = self._compute_bounds(np.asarray(pcd.points))
+        self._cache_put(key, pcd, bounds)
+        return pcd, bounds
+    
+    @staticmethod
+    def _disk_cache_base(key: tuple) -> str:
+        """On-disk cache prefix for a (path, mtime, size) key: one name per source path."""
+        path_hash = hashlib.sha1(key[0].encode("utf-8")).hexdigest()[:16]
+        return os.path.join(config.PCD_DISK_CACHE_DIR, path_hash)
+    
+    def _disk_cache_load(self, key: tuple) -> Optional[o3d.geometry.PointCloud]:
+        """Rebuild a parsed CSV cloud from its .npy cache, or None on a miss."""
+        base = f"{self._disk_cache_base(key)}_{key[1]}_{key[2]}"
+        try:
+            points = np.load(base + "_points.npy", mmap_mode="r")
+            colors = np.load(base + "_colors.npy", mmap_mode="r")
+        except (OSError, ValueError):
             return None
+        pcd = o3d.geometry.PointCloud()
+        pcd.points = o3d.utility.Vector3dVector(np.asarray(points))
+        pcd.colors = o3d.utility.Vector3dVector(np.asarray(colors))
+        del points, colors  # Vector3dVector copied them; release the maps
+        return pcd
+    
+    def _disk_cache_save(self, key: tuple, pcd: o3d.geometry.PointCloud):
+        """Save a parsed CSV cloud as .npy, replacing older entries for the same file."""
+        prefix = self._disk_cache_base(key)
+        base = f"{prefix}_{key[1]}_{key[2]}"
+        try:
+            os.makedirs(config.PCD_DISK_CACHE_DIR, exist_ok=True)
+            for stale in glob.glob(prefix + "_*.npy"):
+                os.remove(stale)
+            for suffix, data in (("_colors.npy", pcd.colors), ("_points.npy", pcd.points)):
+                tmp_path = base + suffix + ".tmp"
+                with open(tmp_path, "wb") as f:
+                    np.save(f, np.asarray(data))
+                os.replace(tmp_path, base + suffix)  # Readers never see a partial file
+        except OSError as e:
+            print(f"Could not write point cloud cache: {e}")
     
     def get_current_cloud(self) -> Optional[o3d.geometry.PointCloud]:
         """Get the currently loaded point cloud."""
@@ -171,8 +513,8 @@ class PointCloudLoader:
     
     def get_point_count(self) -> int:
         """Get the number of points in the current cloud."""
-        if self.current_pcd is not None:
-            return len(self.current_pcd.points)
+        if self.current_points is not None:
+            return len(self.current_points)
         return 0
     
     def get_bounds(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
@@ -183,15 +525,23 @@ class PointCloudLoader:
             Tuple of (min_bound, max_bound) or None if no cloud loaded
         """
         if self.current_pcd is not None:
-            return (self.current_pcd.get_min_bound(), self.current_pcd.get_max_bound())
+            return self.current_bounds
         return None
     
-    def _generate_colors(self, points: np.ndarray) -> np.ndarray:
+    @staticmethod
+    def _solid_colors(n: int, rgb) -> np.ndarray:
+        """N x 3 float64 array of one color (broadcast fill into a single allocation)."""
+        colors = np.empty((n, 3), dtype=np.float64)
+        colors[:] = rgb
+        return colors
+    
+    def _generate_colors(self, points: np.ndarray, assume_flat: bool = False) -> np.ndarray:
         """
         Generate colors for points based on height (z-coordinate).
         
         Args:
             points: Nx3 numpy array of points
+            assume_flat: Caller knows z is constant (2D scan): use the default color without scanning z
             
         Returns:
             Nx3 numpy array of RGB colors (0-1 range)
@@ -199,27 +549,33 @@ class PointCloudLoader:
         if len(points) == 0:
             return np.array([])
         
-        z_values = points[:, 2]
+        if assume_flat:
+            return self._solid_colors(len(points), config.POINT_COLOR_DEFAULT)
         
-        # If all z-values are the same (2D scan), use default color
-        if np.all(z_values == z_values[0]):
-            return np.tile(config.POINT_COLOR_DEFAULT, (len(points), 1))
+        z_values = points[:, 2]
         
         # Color by height using a colormap (blue=low, red=high)
         z_min, z_max = z_values.min(), z_values.max()
         z_range = z_max - z_min
         
+        # If all z-values are the same (2D scan), use default color
         if z_range == 0:
-            return np.tile(config.POINT_COLOR_DEFAULT, (len(points), 1))
-        
-        # Normalize z to 0-1
-        z_norm = (z_values - z_min) / z_range
+            return self._solid_colors(len(points), config.POINT_COLOR_DEFAULT)
         
-        # Create colormap (blue -> cyan -> green -> yellow -> red)
-        colors = np.zeros((len(points), 3))
-        colors[:, 0] = z_norm  # Red channel
-        colors[:, 1] = 1 - np.abs(z_norm - 0.5) * 2  # Green channel (peaks at 0.5)
-        colors[:, 2] = 1 - z_norm  # Blue channel
+        # Create colormap (blue -> cyan -> green -> yellow -> red), filled in place
+        colors = np.empty((len(points), 3), dtype=np.float64)
+        if _height_colors_jit is not None and len(points) >= JIT_COLOR_MIN_POINTS:
+            _height_colors_jit(z_values, z_min, 1.0 / z_range, colors)
+            return colors
+        z_norm = colors[:, 0]  # Red channel: z normalized to 0-1
+        np.subtract(z_values, z_min, out=z_norm)
+        z_norm *= 1.0 / z_range
+        np.subtract(1.0, z_norm, out=colors[:, 2])  # Blue channel
+        green = colors[:, 1]  # Green channel (peaks at 0.5)
+        np.subtract(z_norm, 0.5, out=green)
+        np.abs(green, out=green)
+        green *= -2.0
+        green += 1.0
         
         return colors
 
@@ -6,6 +6,7 @@ Communicates with Raspberry Pi scanner service over MQTT.
 
 import os
 import sys
+import logging
 from typing import Callable, Dict, Optional
 
 # Add parent directory to path for mqtt_protocol import
@@ -15,6 +16,10 @@ from laptop_viewer_client import LaptopViewerClient
 from mqtt_protocol import ScanStatus
 from . import config
 
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("completed", "error", "stopped")  # Statuses that end a scan (never deduplicated)
+
 
 class ScanController:
     """
@@ -32,6 +37,7 @@ class ScanController:
         self.current_scan_type: Optional[str] = None
         self.current_scan_id: Optional[str] = None
         self.scan_type_by_id: Dict[str, str] = {}
+        self._last_status: Optional[tuple] = None  # Last (scan_id, status, message) sent to the callback
         
         # Initialize MQTT client
         try:
@@ -111,6 +117,7 @@ class ScanController:
         
         # Request scan via MQTT
         try:
+            self._last_status = None
             self.current_scan_type = scan_type
             self.scan_running = True
             
@@ -151,6 +158,7 @@ class ScanController:
         try:
             print(f"[SCAN] Requesting stop for scan: {self.current_scan_id}")
             self.mqtt_client.stop_scan(self.current_scan_id)
+            self._last_status = None
             self._update_status("stopped", "Stop request sent to Raspberry Pi")
             # Optimistic local clear so UI is never hard-stuck in running state.
             # If the scan is still active on RPi, next start request will receive "busy".
@@ -191,8 +199,6 @@ class ScanController:
     
     def _merge_robust_slices(self, scan_id: str):
         """Merges all slice files received for this scan into a single PLY."""
-        import glob
-        
         # Look for slice files in data directory
         data_dir = config.DATA_DIR
         # Pattern matches files sent by robust_3d_scan_module
@@ -244,18 +250,16 @@ class ScanController:
             scan_id: Scan identifier
             status: Status message from Raspberry Pi
         """
-        print(f"[SCAN] Status for {scan_id}: {status.status} - {status.message}")
-        
         # Only process if it's our current scan
         if scan_id != self.current_scan_id:
-            print(f"[SCAN] Status for different scan, ignoring")
+            logger.debug("Status for different scan %s, ignoring", scan_id)
             return
         
-        # Update GUI status
-        self._update_status(status.status, status.message)
+        # Update GUI status (_update_status logs it at DEBUG)
+        self._update_status(status.status, status.message, scan_id=scan_id)
         
         # Handle completion
-        if status.status in ["completed", "error", "stopped"]:
+        if status.status in TERMINAL_STATUSES:
             self.scan_running = False
             
             if status.status == "completed":
@@ -286,9 +290,10 @@ class ScanController:
             scan_id: Scan identifier
             file_paths: List of received file paths
         """
-        print(f"[SCAN] Data received for {scan_id}:")
-        for path in file_paths:
-            print(f"  - {path}")
+        logger.info("Data received for %s: %d file(s)", scan_id, len(file_paths))
+        if logger.isEnabledFor(logging.DEBUG):
+            for path in file_paths:
+                logger.debug("  - %s", path)
 
         scan_type = self.scan_type_by_id.get(scan_id, "")
         if self.data_callback:
@@ -297,9 +302,18 @@ class ScanController:
         # Files are automatically saved by the MQTT client
         # GUI can now load them
     
-    def _update_status(self, status: str, message: str):
-        """Update status via callback."""
-        print(f"[STATUS] {status}: {message}")
+    def _update_status(self, status: str, message: str, scan_id: Optional[str] = None):
+        """
+        Update status via callback.
+        
+        Only a repeated progress status for the same MQTT scan is dropped; local,
+        terminal and error statuses always reach the callback.
+        """
+        key = (scan_id, status, message)
+        if scan_id is not None and status not in TERMINAL_STATUSES and key == self._last_status:
+            return
+        self._last_status = key
+        logger.debug("Status %s: %s", status, message)
         if self.status_callback:
             self.status_callback(status, message)
 
@@ -2,19 +2,43 @@
 Standalone point cloud viewer script.
 Launched as a subprocess to avoid GLFW conflicts with main GUI.
 """
+from __future__ import annotations
+
 import sys
 import os
-import open3d as o3d
+import json
+import hashlib
+import queue
+import threading
 import numpy as np
 
+# Bound by _import_open3d() once the arguments are known to be usable, so a usage
+# error returns without paying for the Open3D import.
+o3d = None
 
-def _estimate_axis_size(points_np: np.ndarray) -> float:
-    """Estimate a readable axis size from cloud bounds with sane fallbacks."""
+DAEMON_POLL_SEC = 0.01  # Render-loop wait for new requests in --daemon mode
+
+
+def _import_open3d():
+    global o3d
+    if o3d is None:
+        import open3d
+        o3d = open3d
+
+
+def _cloud_bounds(points_np: np.ndarray):
+    """(min_bound, max_bound) of an Nx3 array, or None when it is empty."""
     if points_np.size == 0:
+        return None
+    return points_np.min(axis=0), points_np.max(axis=0)
+
+
+def _estimate_axis_size(bounds) -> float:
+    """Estimate a readable axis size from cloud bounds with sane fallbacks."""
+    if bounds is None:
         return 0.10
 
-    mins = points_np.min(axis=0)
-    maxs = points_np.max(axis=0)
+    mins, maxs = bounds
     extent = maxs - mins
     max_extent = float(np.max(extent)) if extent.size else 0.0
 
@@ -63,31 +87,106 @@ def _create_axis_labels(axis_size: float) -> o3d.geometry.LineSet:
     return label_lines
 
 
-def _is_2d_scan(file_path: str, points_np: np.ndarray) -> bool:
+def _is_2d_scan(file_path: str, bounds) -> bool:
     """Detect 2D scan outputs so viewer can preserve pre-axes rendering."""
     name = os.path.basename(file_path).lower()
     if name in ("scan.csv", "scan.ply"):
         return True
 
-    if points_np.size == 0:
+    if bounds is None:
         return False
 
     # 2D pipeline outputs z ~ 0 for all points.
-    z_span = float(np.max(points_np[:, 2]) - np.min(points_np[:, 2]))
+    mins, maxs = bounds
+    z_span = float(maxs[2] - mins[2])
     return z_span <= 1e-6
 
 
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: python standalone_viewer.py <point_cloud_file> [point_size]")
-        sys.exit(1)
+def _load_shared_cloud(spec: str):
+    """
+    Build a cloud from a "<name>:<count>" shared-memory block of N x 6 float32 (xyz + rgb).
     
-    file_path = sys.argv[1]
-    point_size = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    Sets the block's trailing ack byte once the points are copied so the GUI may
+    unlink it. Returns None if the block is gone (GUI closed or already released it).
+    """
+    from multiprocessing import shared_memory
     
-    if not os.path.exists(file_path):
+    name, count = spec.rsplit(":", 1)
+    count = int(count)
+    try:
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+        except TypeError:
+            shm = shared_memory.SharedMemory(name=name)
+            if os.name == "posix":
+                # The GUI owns the block; keep this process's tracker from unlinking it on exit
+                from multiprocessing import resource_tracker
+                resource_tracker.unregister(shm._name, "shared_memory")
+    except FileNotFoundError:
+        print(f"Error: Shared point data {name} is no longer available")
+        return None
+    
+    packed = np.ndarray((count, 6), dtype=np.float32, buffer=shm.buf)
+    pcd = o3d.geometry.PointCloud()
+    pcd.points = o3d.utility.Vector3dVector(packed[:, :3].astype(np.float64))
+    pcd.colors = o3d.utility.Vector3dVector(packed[:, 3:].astype(np.float64))
+    del packed
+    if len(shm.buf) > count * 6 * 4:
+        shm.buf[count * 6 * 4] = 1  # ack: the GUI may unlink this block now
+    shm.close()
+    return pcd
+
+
+def _parse_request(argv: list) -> dict:
+    """
+    Parse '<point_cloud_file> [point_size] [--restore-view] [--shm <name>:<count>] [--source <path>]'.
+    
+    --source names the scan the (preview) file was built from; the camera pose is
+    kept per source so switching between scans does not overwrite each other's view.
+    """
+    file_path = argv[0]
+    options = argv[2:]
+    source = options[options.index("--source") + 1] if "--source" in options[:-1] else file_path
+    return {
+        'file_path': file_path,
+        'point_size': int(argv[1]) if len(argv) > 1 else 2,
+        'restore_view': "--restore-view" in options,
+        'shm_spec': options[options.index("--shm") + 1] if "--shm" in options[:-1] else None,
+        # Camera pose saved on close, reapplied when relaunched with --restore-view
+        'camera_file': _camera_file(source),
+    }
+
+
+def _import_viewer_package():
+    """Make the viewer package importable (this script runs with viewer/ rather than the repo root on sys.path)."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if root not in sys.path:
+        sys.path.insert(0, root)
+
+
+def _camera_file(file_path: str) -> str:
+    """Saved camera pose for file_path, kept in the GUI's cache directory: one name per source path."""
+    _import_viewer_package()
+    from viewer import config
+    path_hash = hashlib.sha1(os.path.abspath(file_path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(config.PCD_DISK_CACHE_DIR, path_hash + "_camera.json")
+
+
+def _csv_loader():
+    """GUI's PointCloudLoader."""
+    _import_viewer_package()
+    from viewer.point_cloud_loader import PointCloudLoader
+    return PointCloudLoader()
+
+
+def _load_cloud(req: dict):
+    """Load the requested cloud; prints the problem and returns None on failure."""
+    file_path = req['file_path']
+    shm_spec = req['shm_spec']
+    
+    if shm_spec is None and not os.path.exists(file_path):
         print(f"Error: File not found: {file_path}")
-        sys.exit(1)
+        return None
     
     print(f"Loading {file_path}...")
     
@@ -95,34 +194,48 @@ def main():
     _, ext = os.path.splitext(file_path)
     ext = ext.lower()
     
-    if ext == '.ply':
+    if shm_spec is not None:
+        # Points handed over by the GUI in shared memory: no file re-read/parse
+        pcd = _load_shared_cloud(shm_spec)
+        if pcd is None:
+            return None
+    elif ext == '.ply':
         pcd = o3d.io.read_point_cloud(file_path)
     elif ext == '.csv':
-        # Load CSV (assuming x_m, y_m, z_m columns)
-        import csv
-        points = []
-        with open(file_path, 'r') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                x = float(row.get('x_m', row.get('x', 0)))
-                y = float(row.get('y_m', row.get('y', 0)))
-                z = float(row.get('z_m', row.get('z', 0)))
-                points.append([x, y, z])
-        
-        pcd = o3d.geometry.PointCloud()
-        pcd.points = o3d.utility.Vector3dVector(np.array(points, dtype=np.float64))
+        # Same parser as the GUI (numba/pandas fast paths, height coloring)
+        pcd = _csv_loader().load_file(file_path)
+        if pcd is None:
+            return None
     else:
         print(f"Error: Unsupported file type: {ext}")
-        sys.exit(1)
+        return None
     
     if len(pcd.points) == 0:
         print("Error: Point cloud is empty!")
-        sys.exit(1)
+        return None
     
     # Add colors if missing
     if not pcd.has_colors():
-        colors = np.tile([1.0, 0.0, 0.0], (len(pcd.points), 1))
-        pcd.colors = o3d.utility.Vector3dVector(colors)
+        pcd.paint_uniform_color([1.0, 0.0, 0.0])
+    
+    return pcd
+
+
+def _create_window(filename: str):
+    vis = o3d.visualization.VisualizerWithKeyCallback()
+    vis.create_window(
+        window_name=f"RPLidar Viewer - {filename}",
+        width=1024,
+        height=768,
+        visible=True,
+    )
+    return vis
+
+
+def _populate(vis, req: dict, pcd: o3d.geometry.PointCloud):
+    """Show pcd (plus axes for 3D scans) in vis with the requested point size and camera."""
+    file_path = req['file_path']
+    point_size = req['point_size']
     
     filename = os.path.basename(file_path)
     print(f"\n{'='*50}")
@@ -134,12 +247,13 @@ def main():
     # Add directional XYZ axes at the sensor origin.
     # This matches the merged-cloud math in robust_3d_scan_module.py where
     # points are expressed in a single global frame around (0, 0, 0).
-    points_np = np.asarray(pcd.points)
-    show_axes = not _is_2d_scan(file_path, points_np)
+    # One min/max pass serves both the 2D check and the axis size
+    bounds = _cloud_bounds(np.asarray(pcd.points))
+    show_axes = not _is_2d_scan(file_path, bounds)
     axes = None
     axis_labels = None
     if show_axes:
-        axis_size = _estimate_axis_size(points_np)
+        axis_size = _estimate_axis_size(bounds)
         axes = o3d.geometry.TriangleMesh.create_coordinate_frame(
             size=axis_size,
             origin=[0.0, 0.0, 0.0],
@@ -150,14 +264,7 @@ def main():
         print("  A -> toggle axes + XYZ labels")
         print(f"{'='*50}\n")
 
-    # Launch viewer with explicit render options so point size is honored.
-    vis = o3d.visualization.VisualizerWithKeyCallback()
-    vis.create_window(
-        window_name=f"RPLidar Viewer - {filename}",
-        width=1024,
-        height=768,
-        visible=True,
-    )
+    vis.clear_geometries()
     vis.add_geometry(pcd)
     if show_axes:
         vis.add_geometry(axes)
@@ -180,13 +287,131 @@ def main():
             print("[VIEWER] Axes shown")
         return False
 
-    if show_axes:
-        vis.register_key_callback(ord('A'), _toggle_axes)
+    # Re-registered per cloud so 'A' always refers to the current axes
+    vis.register_key_callback(ord('A'), _toggle_axes)
 
     render_opt = vis.get_render_option()
     render_opt.point_size = float(max(1, point_size))
 
+    camera_file = req['camera_file']
+    if req['restore_view'] and os.path.exists(camera_file):
+        params = o3d.io.read_pinhole_camera_parameters(camera_file)
+        if not vis.get_view_control().convert_from_pinhole_camera_parameters(params, allow_arbitrary=True):
+            print("[VIEWER] Saved camera does not fit this window, using default view")
+
+
+def _save_camera(vis, camera_file: str):
+    params = vis.get_view_control().convert_to_pinhole_camera_parameters()
+    try:
+        os.makedirs(os.path.dirname(camera_file), exist_ok=True)
+    except OSError as e:
+        print(f"[VIEWER] Could not save camera: {e}")
+        return
+    if not o3d.io.write_pinhole_camera_parameters(camera_file, params):
+        print(f"[VIEWER] Could not save camera to {camera_file}")
+
+
+def _run_daemon():
+    """
+    Serve viewer requests from stdin, one JSON argument list per line, until EOF.
+    
+    Keeps the interpreter and Open3D loaded between Visualize clicks; a request that
+    arrives while a window is open replaces its contents in place. A
+    ["--point-size", n] line only changes the open window's point size.
+    """
+    requests = queue.Queue()
+    
+    def _read_stdin():
+        try:
+            for line in sys.stdin:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    argv = json.loads(line)
+                except ValueError as e:
+                    print(f"[VIEWER] Ignoring malformed request {line!r}: {e}")
+                    continue
+                if not isinstance(argv, list) or not argv:
+                    print(f"[VIEWER] Ignoring request that is not an argument list: {line!r}")
+                    continue
+                requests.put([str(arg) for arg in argv])
+        finally:
+            # Always unblock the main loop, even if reading stdin failed
+            requests.put(None)
+    
+    threading.Thread(target=_read_stdin, daemon=True).start()
+    
+    vis = None
+    camera_file = None
+    while True:
+        if vis is None:
+            argv = requests.get()
+        else:
+            if not vis.poll_events():
+                _save_camera(vis, camera_file)
+                vis.destroy_window()
+                vis = None
+                print("Viewer closed.")
+                continue
+            vis.update_renderer()
+            try:
+                argv = requests.get(timeout=DAEMON_POLL_SEC)
+            except queue.Empty:
+                continue
+        
+        if argv is None:
+            break
+        # A bad request (missing file, released shared memory, bad arguments) is
+        # reported and skipped; the daemon keeps serving the GUI.
+        try:
+            if argv[0] == "--point-size":
+                # Render option only: the uploaded geometry is left as it is
+                if vis is not None:
+                    vis.get_render_option().point_size = float(max(1, int(argv[1])))
+                continue
+            req = _parse_request(argv)
+            pcd = _load_cloud(req)
+            if pcd is None:
+                continue
+            if vis is None:
+                vis = _create_window(os.path.basename(req['file_path']))
+            else:
+                _save_camera(vis, camera_file)
+            _populate(vis, req, pcd)
+            camera_file = req['camera_file']
+        except Exception as e:
+            print(f"[VIEWER] Request {argv!r} failed: {e}")
+    
+    if vis is not None:
+        _save_camera(vis, camera_file)
+        vis.destroy_window()
+
+
+def main():
+    if len(sys.argv) >= 2 and sys.argv[1] == "--daemon":
+        _import_open3d()  # up front, so the first request is served without it
+        _run_daemon()
+        return
+    
+    if len(sys.argv) < 2:
+        print("Usage: python standalone_viewer.py <point_cloud_file> [point_size] "
+              "[--restore-view] [--shm <name>:<count>] [--source <path>]")
+        print("       python standalone_viewer.py --daemon   (same arguments as JSON lines on stdin)")
+        sys.exit(1)
+    
+    req = _parse_request(sys.argv[1:])
+    _import_open3d()
+    pcd = _load_cloud(req)
+    if pcd is None:
+        sys.exit(1)
+
+    # Launch viewer with explicit render options so point size is honored.
+    vis = _create_window(os.path.basename(req['file_path']))
+    _populate(vis, req, pcd)
+
     vis.run()
+    _save_camera(vis, req['camera_file'])
     vis.destroy_window()
     
     print("Viewer closed.")